@@ -0,0 +1,84 @@
+import argparse
+import json
+import platform
+import sys
+import time
+
+from benchmarks import bench_engine, bench_render, bench_gesture, bench_game
+from benchmarks.harness import Skipped
+
+GROUPS = {
+    'engine': bench_engine.run,
+    'render': bench_render.run,
+    'gesture': bench_gesture.run,
+    'game': bench_game.run,
+}
+
+def compare(results, baseline, threshold):
+    """Prints per-benchmark ratios against a baseline run and returns the names that regressed."""
+    regressions = []
+    for name, result in sorted(results.items()):
+        before = baseline.get('results', {}).get(name)
+        if not before:
+            print(f"  {name:32s} (new)")
+            continue
+        ratio = result['ns_per_op'] / before['ns_per_op']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"  {name:32s} {before['ns_per_op']:12,.0f} -> {result['ns_per_op']:12,.0f} ns  x{ratio:.2f}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the NeonLink benchmark suite offline.")
+    parser.add_argument('--only', default=','.join(GROUPS), help="comma-separated groups: " + ', '.join(GROUPS))
+    parser.add_argument('--quick', action='store_true', help="fewer iterations, for smoke runs")
+    parser.add_argument('--landmarks', help="recorded (N, 21, 3) landmark .npy file for the gesture group")
+    parser.add_argument('--output', help="write results as JSON to this path")
+    parser.add_argument('--baseline', help="JSON results from an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.15, help="slowdown ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    results = {}
+    skipped = {}
+    for group in args.only.split(','):
+        kwargs = {'quick': args.quick}
+        if group == 'gesture':
+            kwargs['landmarks_path'] = args.landmarks
+        try:
+            results.update(GROUPS[group](**kwargs))
+        except Skipped as e:
+            skipped[group] = str(e)
+            print(f"Skipping {group}: {e}")
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': args.quick,
+        },
+        'results': results,
+        'skipped': skipped,
+    }
+
+    for name, result in sorted(results.items()):
+        print(f"{name:32s} {result['ns_per_op']:12,.0f} ns/op  (best {result['best_ns']:,.0f})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline}:")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than x{1 + args.threshold:.2f}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
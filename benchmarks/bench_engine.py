@@ -0,0 +1,54 @@
+import random
+
+from src.tetris_core import TetrisEngine, GRID_WIDTH, GRID_HEIGHT, COLORS
+from src.headless import random_policy
+from benchmarks.harness import measure
+
+def generated_engines(count, seed=0, max_pieces=12):
+    """Engines in varied mid-game states, built by playing a random number of random placements."""
+    rng = random.Random(seed)
+    engines = []
+    while len(engines) < count:
+        engine = TetrisEngine(rng.getrandbits(32))
+        for _ in range(rng.randint(0, max_pieces)):
+            random_policy(engine, rng)
+        if not engine.game_over:
+            engines.append(engine)
+    return engines
+
+def fill_rows(engine, count):
+    """Fills the bottom `count` rows so the next clear_rows has work to do."""
+    for y in range(GRID_HEIGHT - count, GRID_HEIGHT):
+        for x in range(GRID_WIDTH):
+            engine.board[y * GRID_WIDTH + x] = x % len(COLORS) + 1
+            engine.rows[y] |= 1 << x
+            engine.cols[x] |= 1 << y
+        engine.row_fill[y] = GRID_WIDTH
+    engine._refresh_columns(range(GRID_WIDTH))
+    return engine
+
+def run(quick=False):
+    number = 100 if quick else 500
+    pool = generated_engines(64)
+    snapshots = [engine.snapshot() for engine in pool]
+
+    def copies(n):
+        return [TetrisEngine.from_snapshot(snapshots[i % len(snapshots)]) for i in range(n)]
+
+    def shared(n):
+        return [pool[i % len(pool)] for i in range(n)]
+
+    def with_full_rows(n):
+        return [fill_rows(engine, 4) for engine in copies(n)]
+
+    return {
+        'engine.valid_space': measure(lambda e: e.valid_space(e.current_piece), shared, number * 10),
+        'engine.drop_distance': measure(lambda e: e.drop_distance(e.current_piece), shared, number * 10),
+        'engine.lock_piece': measure(lambda e: e.lock_piece(), copies, number),
+        'engine.clear_rows.none': measure(lambda e: e.clear_rows(), copies, number),
+        'engine.clear_rows.tetris': measure(lambda e: e.clear_rows(), with_full_rows, number),
+        'engine.hard_drop': measure(lambda e: e.hard_drop(), copies, number),
+        'engine.rotate_piece': measure(lambda e: e.rotate_piece(), copies, number),
+        'engine.snapshot': measure(lambda e: e.snapshot(), shared, number * 10),
+        'engine.snapshot_restore': measure(lambda e: e.restore(e.snapshot()), copies, number),
+    }
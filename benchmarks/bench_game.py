@@ -0,0 +1,65 @@
+import random
+
+from src.tetris_core import TetrisEngine, ROTATION_COUNTS
+from src.bot import AutoPlayer
+from src.headless import random_policy
+from src import replay
+from benchmarks.harness import measure_once
+
+def bot_game(pieces, seed=0):
+    """Plays `pieces` placements with the AutoPlayer; returns the number of pieces played."""
+    engine = TetrisEngine(seed)
+    player = AutoPlayer()
+    while not engine.game_over and engine.pieces < pieces:
+        player.play(engine)
+    return engine.pieces
+
+def random_games(games, seed=0):
+    rng = random.Random(seed)
+    pieces = 0
+    for game in range(games):
+        engine = TetrisEngine(seed + game)
+        while not engine.game_over:
+            random_policy(engine, rng)
+        pieces += engine.pieces
+    return pieces
+
+def recorded_game(seed=0, pieces=100):
+    """Builds a replay of a bot game with gravity ticks between inputs, like a real session."""
+    engine = TetrisEngine(seed)
+    recorder = replay.ReplayRecorder.for_engine(engine)
+    player = AutoPlayer()
+    tick = 0
+    while not engine.game_over and engine.pieces < pieces:
+        placement = player.plan(engine)
+        piece = engine.current_piece
+        for _ in range((placement.rotation - piece.rotation) % ROTATION_COUNTS[piece.shape_type]):
+            tick += 3
+            recorder.record(tick, replay.ROTATE)
+            engine.rotate_piece()
+        dx = placement.x - piece.x
+        for _ in range(abs(dx)):
+            tick += 3
+            recorder.record(tick, replay.MOVE_RIGHT if dx > 0 else replay.MOVE_LEFT)
+            engine.move_piece(1 if dx > 0 else -1, 0)
+        tick += 30
+        recorder.record(tick, replay.GRAVITY)
+        engine.move_piece(0, 1)
+        tick += 5
+        recorder.record(tick, replay.HARD_DROP)
+        engine.hard_drop()
+    return replay.Replay.from_bytes(recorder.to_bytes())
+
+def run(quick=False):
+    pieces = 50 if quick else 300
+    log = recorded_game()
+
+    def replay_run():
+        log.simulate()
+        return len(log.events)
+
+    return {
+        'game.bot_loop': measure_once(lambda: bot_game(pieces)),
+        'game.random_loop': measure_once(lambda: random_games(10 if quick else 100)),
+        'game.replay_playback': measure_once(replay_run),
+    }
@@ -0,0 +1,53 @@
+from collections import namedtuple
+
+from benchmarks.harness import measure, measure_once, Skipped
+
+Landmark = namedtuple('Landmark', ['x', 'y', 'z'])
+
+# Landmark y coordinates (image space, smaller is higher) for the wrist, then thumb and the four
+# fingers from base to tip. x spreads the fingers across the hand.
+_POSES = {
+    'OPEN_PALM': [0.9, 0.8, 0.7, 0.6, 0.5] + [0.6, 0.45, 0.35, 0.25] * 4,
+    'CLOSED_FIST': [0.9, 0.8, 0.72, 0.7, 0.69] + [0.6, 0.55, 0.62, 0.66] * 4,
+    'THUMB_UP': [0.9, 0.75, 0.6, 0.45, 0.3] + [0.6, 0.55, 0.62, 0.66] * 4,
+}
+
+def synthetic_landmarks(count, seed=0):
+    """
+    Generates a (count, 21, 3) array of jittered hand poses cycling through the known gestures,
+    standing in for a recorded landmark stream when none is supplied.
+    """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    poses = list(_POSES.values())
+    frames = np.zeros((count, 21, 3), dtype=np.float32)
+    for i in range(count):
+        ys = np.array(poses[i % len(poses)], dtype=np.float32)
+        frames[i, :, 0] = 0.3 + 0.02 * np.arange(21)
+        frames[i, :, 1] = ys + rng.normal(0, 0.01, 21)
+    return frames
+
+def run(quick=False, landmarks_path=None):
+    try:
+        import numpy as np
+        from src.ai.gestures import classify_gestures
+        from src.ai.hand_tracker import HandTracker
+    except ImportError as e:
+        raise Skipped(f"gesture benchmarks need the vision dependencies ({e})")
+
+    frames = np.load(landmarks_path) if landmarks_path else synthetic_landmarks(512)
+    hands = [[Landmark(*point) for point in frame.tolist()] for frame in frames]
+    number = 500 if quick else 5000
+
+    def samples(n):
+        return [hands[i % len(hands)] for i in range(n)]
+
+    def classify_all():
+        # Per-frame cost of labelling the whole recording in one batch
+        classify_gestures(frames)
+        return len(frames)
+
+    return {
+        'gesture.detect_gesture': measure(HandTracker._detect_gesture, samples, number),
+        'gesture.classify_batch': measure_once(classify_all, repeat=10 if quick else 50),
+    }
@@ -0,0 +1,47 @@
+import os
+
+from benchmarks.harness import measure, Skipped
+from benchmarks.bench_engine import generated_engines
+
+def run(quick=False):
+    # Render offscreen: no window, no audio device
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    try:
+        import numpy as np
+        import pygame
+        import main as game
+        from src.ai.hand_tracker import PreviewExchange
+    except ImportError as e:
+        raise Skipped(f"render benchmarks need the desktop dependencies ({e})")
+
+    pygame.display.init()
+    pygame.font.init()
+    game.load_fonts()
+    surface = pygame.display.set_mode((game.WINDOW_WIDTH, game.WINDOW_HEIGHT))
+    number = 20 if quick else 100
+    engines = generated_engines(16, seed=1)
+
+    def frames(n):
+        return [engines[i % len(engines)] for i in range(n)]
+
+    # A 640x480 BGR webcam frame, like the ones HandTracker hands to the render loop
+    camera_frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+
+    # Both halves of the hand-off: the tracker thread publishing and the render loop blitting
+    exchange = PreviewExchange((240, 180))
+    preview_surface = pygame.Surface((240, 180))
+
+    def camera_preview(frame):
+        exchange.publish(frame)
+        _, rgb = exchange.acquire()
+        pygame.surfarray.blit_array(preview_surface, np.swapaxes(rgb, 0, 1))
+        surface.blit(preview_surface, (0, 0))
+
+    results = {
+        'render.draw_window': measure(lambda e: game.draw_window(surface, e, 50.0, 1000), frames, number),
+        'render.draw_grid': measure(lambda e: game.draw_grid(surface), frames, number),
+        'render.camera_preview': measure(camera_preview, lambda n: [camera_frame] * n, number),
+    }
+    pygame.quit()
+    return results
@@ -0,0 +1,30 @@
+import statistics
+import time
+
+def measure(op, setup, number=200, repeat=5):
+    """
+    Times `op(state)` over `number` fresh states per round. `setup(number)` builds the states
+    outside the timed region, so mutating operations such as lock_piece always start clean.
+    Returns nanoseconds per call: the median and best of `repeat` rounds.
+    """
+    rounds = []
+    for _ in range(repeat):
+        states = setup(number)
+        start = time.perf_counter_ns()
+        for state in states:
+            op(state)
+        rounds.append((time.perf_counter_ns() - start) / number)
+    return {'ns_per_op': statistics.median(rounds), 'best_ns': min(rounds), 'ops': number * repeat}
+
+def measure_once(run, repeat=3):
+    """Times a whole workload `run()` that returns how many operations it performed."""
+    rounds = []
+    ops = 0
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        ops = run()
+        rounds.append((time.perf_counter_ns() - start) / max(ops, 1))
+    return {'ns_per_op': statistics.median(rounds), 'best_ns': min(rounds), 'ops': ops * repeat}
+
+class Skipped(Exception):
+    """Raised by a benchmark group whose optional dependencies are not installed."""
@@ -1,9 +1,19 @@
+import time
+# Startup is timed from here, before the heavier imports below
+STARTED = time.perf_counter()
 import pygame
 import sys
-import cv2
+import os
+from collections import Counter
+from functools import lru_cache
 import numpy as np
-from src.tetris_core import TetrisEngine, GRID_WIDTH, GRID_HEIGHT, Piece
-from src.ai.hand_tracker import HandTracker
+from src.tetris_core import TetrisEngine, RewindBuffer, GRID_WIDTH, GRID_HEIGHT, PALETTE, Piece
+from src import replay
+from src.profiler import FrameProfiler
+from src.startup import StartupTimer, BackgroundTask
+from src.audio import AudioManager
+from src.leaderboard import Leaderboard, GameRecord
+# The vision stack (OpenCV, MediaPipe) is imported on a background thread by start_tracker()
 
 # Window configurations
 BLOCK_SIZE = 30
@@ -24,40 +34,333 @@ WHITE = (255, 255, 255)
 GRAY = (128, 128, 128)
 GRID_COLOR = (40, 40, 40)
 
+# Board cell value -> RGB, for turning the engine's palette-index board into an image
+BOARD_PALETTE = np.array(PALETTE, dtype=np.uint8)
+
 # Font Name: Use a monospaced "cyber" feeling font if available, fallback to courier
 FONT_NAME = 'couriernew'
 
-def draw_grid(surface):
+# Font registry: role -> (name, size, bold). SysFont does a system lookup and load on every call,
+# so each font is created once and shared.
+FONT_SPECS = {
+    'title': (FONT_NAME, 50, True),
+    'hud': (FONT_NAME, 25, True),
+    'legend': (FONT_NAME, 20, False),
+    'pause': (FONT_NAME, 80, True),
+    'game_over': ('comicsans', 80, False),
+    'restart': ('comicsans', 40, False),
+    'profiler': (FONT_NAME, 16, False),
+}
+FONTS = {}
+
+def load_fonts():
+    """Loads every registered font up front and drops labels rendered with older fonts."""
+    FONTS.clear()
+    render_text.cache_clear()
+    for role in FONT_SPECS:
+        get_font(role)
+
+def get_font(role):
+    font = FONTS.get(role)
+    if font is None:
+        name, size, bold = FONT_SPECS[role]
+        font = FONTS[role] = pygame.font.SysFont(name, size, bold=bold)
+    return font
+
+@lru_cache(maxsize=256)
+def render_text(role, text, color):
+    """Renders a label with a registered font. Cached on (font, text, color); do not draw on the result."""
+    return get_font(role).render(text, 1, color)
+
+# Set NEONLINK_PLAYERS=2 for split-screen: one camera pass tracks both hands, one per player
+SUPPORTED_PLAYERS = (1, 2)
+
+def players_from_env():
+    """Reads NEONLINK_PLAYERS, exiting with a message if it is not a supported player count."""
+    value = os.environ.get('NEONLINK_PLAYERS', '').strip() or '1'
+    try:
+        players = int(value)
+    except ValueError:
+        players = None
+    if players not in SUPPORTED_PLAYERS:
+        raise SystemExit(f"NEONLINK_PLAYERS={value!r} is not supported; use 1 (solo) or 2 (split-screen)")
+    return players
+
+PLAYERS = players_from_env()
+# Leaderboard names, comma separated (e.g. NEONLINK_PLAYER_NAMES=alice,bob)
+PLAYER_NAMES = (os.environ.get('NEONLINK_PLAYER_NAMES', '').split(',') + [''] * PLAYERS)[:PLAYERS]
+
+# Set NEONLINK_TRACKER=process to run gesture recognition in its own process (its own core and GIL)
+TRACKER_MODE = os.environ.get('NEONLINK_TRACKER', 'thread')
+
+class PendingTracker:
+    """Stands in for the hand tracker while it loads: keyboard play only, no gestures or preview."""
+    def __init__(self, num_hands):
+        self.num_hands = num_hands
+
+    def get_gestures(self):
+        return ["NONE"] * self.num_hands
+
+    def get_preview(self, last_seq=0):
+        return None
+
+    def report_frame_time(self, frame_ms):
+        pass
+
+    def get_stats(self):
+        return {'quality': 'loading'}
+
+    def stop(self):
+        pass
+
+def start_tracker(preview_size, profiler, timer):
+    """Background startup: imports the vision stack, builds the landmarker and opens the camera."""
+    with timer.phase('vision.import'):
+        if TRACKER_MODE == 'process':
+            from src.ai.process_tracker import ProcessHandTracker as tracker_class
+        else:
+            from src.ai.hand_tracker import HandTracker as tracker_class
+    with timer.phase('vision.model'):
+        # With two players one landmarker pass looks for both hands
+        tracker = tracker_class(preview_size=preview_size, profiler=profiler, num_hands=PLAYERS)
+    print("Starting AI Camera...")
+    with timer.phase('vision.camera'):
+        tracker.start()
+    return tracker
+
+# Game logic advances in fixed ticks; rendering is capped separately (NEONLINK_FPS, 0 = uncapped)
+# Replays are stamped in these ticks
+SIM_HZ = replay.SIM_HZ
+TICK_MS = 1000 / SIM_HZ
+# A long stall (window drag, debugger) is not caught up tick by tick
+MAX_FRAME_MS = 250
+# Below this cap every frame would exceed MAX_FRAME_MS and the game would run in slow motion
+MIN_FPS_CAP = 1000 // MAX_FRAME_MS
+
+def fps_cap_from_env():
+    """Reads NEONLINK_FPS, exiting with a message unless it is 0 (uncapped) or at least MIN_FPS_CAP."""
+    value = os.environ.get('NEONLINK_FPS', '').strip() or '60'
+    try:
+        cap = int(value)
+    except ValueError:
+        cap = None
+    if cap is None or (cap != 0 and cap < MIN_FPS_CAP):
+        raise SystemExit(f"NEONLINK_FPS={value!r} is not supported; use 0 (uncapped) or a frame rate of at least {MIN_FPS_CAP}")
+    return cap
+
+FPS_CAP = fps_cap_from_env()
+# How often idle screens wake to check for gestures
+IDLE_POLL_MS = 100
+# Vibe meter drain per tick
+VIBE_DECAY = 0.2
+
+# F3 toggles the frame-time overlay; set NEONLINK_PROFILE to a .csv or .json path to export on exit
+PROFILE_EXPORT = os.environ.get('NEONLINK_PROFILE')
+PROFILE_REFRESH_MS = 500
+PROFILE_PHASES = ('tracker', 'events', 'update', 'draw', 'preview', 'hud', 'display', 'frame',
+                  'tracker.capture', 'tracker.convert', 'tracker.inference', 'tracker.gesture', 'tracker.publish')
+
+def render_profile_panel(summary, tracker_stats):
+    """Renders the F3 overlay: p50/p95/p99 milliseconds for every profiled phase."""
+    font = get_font('profiler')
+    lines = [f"{'PHASE':18s}{'P50':>7s}{'P95':>7s}{'P99':>7s}"]
+    for name in PROFILE_PHASES:
+        stats = summary.get(name)
+        if stats:
+            lines.append(f"{name:18s}{stats['p50']:7.2f}{stats['p95']:7.2f}{stats['p99']:7.2f}")
+    quality = tracker_stats['quality']
+    if 'quality_changes' in tracker_stats:
+        quality += f" ({tracker_stats['quality_changes']} changes)"
+    lines.append(f"tracker quality: {quality}")
+
+    line_h = font.get_linesize()
+    labels = [font.render(line, 1, (0, 255, 0) if idx else (0, 255, 255)) for idx, line in enumerate(lines)]
+    panel = pygame.Surface((max(label.get_width() for label in labels) + 12, line_h * len(labels) + 12))
+    panel.fill((15, 15, 35))
+    for idx, label in enumerate(labels):
+        panel.blit(label, (6, 6 + idx * line_h))
+    return panel
+
+def wait_for_input(timeout=0):
+    """Sleeps until an input or window event arrives (or `timeout` ms pass), leaving it queued."""
+    event = pygame.event.wait(timeout) if timeout else pygame.event.wait()
+    if event.type != pygame.NOEVENT:
+        pygame.event.post(event)
+
+# Every game's inputs are logged here so sessions can be re-simulated with `python -m src.replay`
+REPLAY_DIR = 'replays'
+
+def save_replay(recorder, engine):
+    """Writes a game's input log to REPLAY_DIR, with `engine`'s final state so playback can be checked."""
+    try:
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        recorder.save(os.path.join(REPLAY_DIR, time.strftime('%Y%m%d-%H%M%S') + f'-{recorder.seed}.nlr'), engine)
+    except OSError as e:
+        print("Replay save error:", e)
+
+def draw_grid(surface, left=None, top=None):
+    # Defaults to the play area on the main window
+    left = TOP_LEFT_X if left is None else left
+    top = TOP_LEFT_Y if top is None else top
     for i in range(GRID_HEIGHT):
-        pygame.draw.line(surface, GRID_COLOR, (TOP_LEFT_X, TOP_LEFT_Y + i * BLOCK_SIZE),
-                         (TOP_LEFT_X + PLAY_WIDTH, TOP_LEFT_Y + i * BLOCK_SIZE))
-        for j in range(GRID_WIDTH):
-            pygame.draw.line(surface, GRID_COLOR, (TOP_LEFT_X + j * BLOCK_SIZE, TOP_LEFT_Y),
-                             (TOP_LEFT_X + j * BLOCK_SIZE, TOP_LEFT_Y + PLAY_HEIGHT))
-
-def draw_window(surface, engine, vibe_score, high_score):
-    surface.fill(BLACK)
-    
-    # Title (Moved higher and centered over the whole window)
-    font = pygame.font.SysFont(FONT_NAME, 50, bold=True)
-    label = font.render('NEONLINK: KINETIC CORE', 1, (0, 255, 255))
-    surface.blit(label, (WINDOW_WIDTH / 2 - (label.get_width() / 2), 15))
+        pygame.draw.line(surface, GRID_COLOR, (left, top + i * BLOCK_SIZE),
+                         (left + PLAY_WIDTH, top + i * BLOCK_SIZE))
+    for j in range(GRID_WIDTH):
+        pygame.draw.line(surface, GRID_COLOR, (left + j * BLOCK_SIZE, top),
+                         (left + j * BLOCK_SIZE, top + PLAY_HEIGHT))
+
+CONTROLS_TEXT = [
+    "CONTROLS",
+    "Arrows / W : Move & Rotate",
+    "P          : Pause",
+    "ESC        : Quit",
+    "BACKSPACE  : Undo Drop",
+    "AI OPEN    : Slow Time",
+    "AI FIST    : Kinetic Slam"
+]
+
+# Split-screen legends; player 1 plays on the left half with WASD, player 2 on the right with the arrows
+PLAYER_CONTROLS_TEXT = [
+    [
+        "PLAYER 1",
+        "A / D / W  : Move & Rotate",
+        "S          : Soft Drop",
+        "Q          : Undo Drop",
+        "LEFT HAND  : Open / Fist",
+    ],
+    [
+        "PLAYER 2",
+        "Arrows     : Move & Rotate",
+        "BACKSPACE  : Undo Drop",
+        "RIGHT HAND : Open / Fist",
+    ],
+]
+
+class RenderCache:
+    """
+    Pre-rendered layers for draw_window. The background (title, legend, vibe label) and the board
+    overlay (grid lines and frame) are drawn once; locked cells live in their own surface that is
+    only redrawn when the engine's board_version changes, one pixel per cell scaled up by
+    BLOCK_SIZE. Tracks which screen rects changed.
+    """
+    def __init__(self, size, origin=None, title='NEONLINK: KINETIC CORE', controls=CONTROLS_TEXT):
+        self.size = size
+        # Defaults to the play area on the main window
+        self.origin = (TOP_LEFT_X, TOP_LEFT_Y) if origin is None else origin
+        self.title = title
+        self.controls = controls
+        left, top = self.origin
+        self.board_rect = pygame.Rect(left, top, PLAY_WIDTH, PLAY_HEIGHT)
+        self.info_x = left + PLAY_WIDTH + 80
+        self.vibe_rect = pygame.Rect(self.info_x, top + 120, 40, PLAY_HEIGHT - 120)
+
+        self.background = pygame.Surface(size)
+        self._draw_background(self.background)
+
+        # Grid lines and frame, with black keyed out so the cells show through.
+        # The line end points reach one pixel past the play area.
+        self.overlay = pygame.Surface((PLAY_WIDTH + 1, PLAY_HEIGHT + 1))
+        self.overlay.fill(BLACK)
+        draw_grid(self.overlay, 0, 0)
+        pygame.draw.rect(self.overlay, (0, 255, 255), (0, 0, PLAY_WIDTH, PLAY_HEIGHT), 5)
+        self.overlay.set_colorkey(BLACK)
+
+        self.cells = pygame.Surface((GRID_WIDTH, GRID_HEIGHT))
+        self.board = pygame.Surface((PLAY_WIDTH, PLAY_HEIGHT))
+        self.board_key = None
+
+        # Last drawn rect and content of every dynamic label, by name
+        self.labels = {}
+        self.full_redraw = True
+
+    def _draw_background(self, surface):
+        surface.fill(BLACK)
+
+        # Title (Moved higher and centered over the whole window)
+        label = render_text('title', self.title, (0, 255, 255))
+        surface.blit(label, (self.size[0] / 2 - (label.get_width() / 2), 15))
+
+        vibe_lbl = render_text('hud', 'VIBE', (255, 0, 255))
+        surface.blit(vibe_lbl, (self.vibe_rect.x - 10, self.vibe_rect.y - 30))
+
+        # Legend panel
+        legend_x = self.origin[0] + 20
+        legend_y = self.origin[1] + PLAY_HEIGHT + 20
+        for idx, line in enumerate(self.controls):
+            lbl = render_text('legend', line, WHITE if idx > 0 else (0, 255, 255))
+            surface.blit(lbl, (legend_x, legend_y + (idx * 25)))
+
+    def invalidate(self):
+        """Forces a full repaint on the next frame, e.g. after a pause or game over overlay."""
+        self.full_redraw = True
+        self.labels.clear()
+
+    def begin_frame(self, surface):
+        """Repaints the background if needed. Returns the rects already dirtied this frame."""
+        if self.full_redraw:
+            surface.blit(self.background, (0, 0))
+            self.full_redraw = False
+            return [surface.get_rect()]
+        return []
+
+    def update_board(self, engine):
+        key = (id(engine), engine.board_version)
+        if key == self.board_key:
+            return
+        self.board_key = key
+        # Palette lookup for every cell at once, then one blit and a nearest-neighbour scale
+        rgb = BOARD_PALETTE[engine.board_array()]
+        pygame.surfarray.blit_array(self.cells, rgb.swapaxes(0, 1))
+        pygame.transform.scale(self.cells, (PLAY_WIDTH, PLAY_HEIGHT), self.board)
+
+    def blit_label(self, surface, name, content, render, pos):
+        """
+        Draws a dynamic label, restoring the background under its previous position first.
+        `render` is only called when `content` changed. Returns the dirty rect, or None.
+        """
+        previous = self.labels.get(name)
+        if previous and previous[0] == content:
+            return None
+
+        label = render()
+        rect = label.get_rect(topleft=pos)
+        dirty = rect.union(previous[1]) if previous else rect
+        surface.blit(self.background, dirty, dirty)
+        surface.blit(label, rect)
+        self.labels[name] = (content, rect)
+        return dirty
+
+_render_cache = None
+
+def get_render_cache(surface):
+    """Returns the RenderCache for the current window layout, rebuilding it if the layout changed."""
+    global _render_cache
+    if (_render_cache is None or _render_cache.size != surface.get_size()
+            or _render_cache.origin != (TOP_LEFT_X, TOP_LEFT_Y)):
+        _render_cache = RenderCache(surface.get_size())
+    return _render_cache
+
+def draw_window(surface, engine, vibe_score, high_score, cache=None):
+    """
+    Draws one frame from the cached layers and returns the list of rects that changed, relative to
+    `surface`. `cache` lays out one split-screen half; by default the window's own cache is used.
+    """
+    if cache is None:
+        cache = get_render_cache(surface)
+    dirty = cache.begin_frame(surface)
+    left, top = cache.origin
 
     # Scores (Moved slightly lower)
-    score_font = pygame.font.SysFont(FONT_NAME, 25, bold=True)
-    score_lbl = score_font.render(f'SCORE: {engine.score}', 1, WHITE)
-    hs_lbl = score_font.render(f'HIGH: {high_score}', 1, WHITE)
-    
     # Moved to the right side of the board for better spacing
-    info_x = TOP_LEFT_X + PLAY_WIDTH + 80
-    surface.blit(score_lbl, (info_x, TOP_LEFT_Y))
-    surface.blit(hs_lbl, (info_x, TOP_LEFT_Y + 40))
+    info_x = cache.info_x
+    dirty.append(cache.blit_label(surface, 'score', engine.score,
+                                  lambda: render_text('hud', f'SCORE: {engine.score}', WHITE), (info_x, top)))
+    dirty.append(cache.blit_label(surface, 'high', high_score,
+                                  lambda: render_text('hud', f'HIGH: {high_score}', WHITE), (info_x, top + 40)))
 
     # Grid pieces
-    for i in range(GRID_HEIGHT):
-        for j in range(GRID_WIDTH):
-            if engine.grid[i][j] != (0, 0, 0):
-                pygame.draw.rect(surface, engine.grid[i][j], (TOP_LEFT_X + j * BLOCK_SIZE, TOP_LEFT_Y + i * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE), 0)
+    cache.update_board(engine)
+    surface.blit(cache.board, cache.board_rect)
 
     # Current Piece
     if engine.current_piece:
@@ -65,14 +368,14 @@ def draw_window(surface, engine, vibe_score, high_score):
         for i, pos in enumerate(shape_pos):
             x, y = pos
             if y > -1:
-                pygame.draw.rect(surface, engine.current_piece.color, (TOP_LEFT_X + x * BLOCK_SIZE, TOP_LEFT_Y + y * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE), 0)
+                pygame.draw.rect(surface, engine.current_piece.color, (left + x * BLOCK_SIZE, top + y * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE), 0)
 
-    # Grid lines
-    draw_grid(surface)
-    pygame.draw.rect(surface, (0, 255, 255), (TOP_LEFT_X, TOP_LEFT_Y, PLAY_WIDTH, PLAY_HEIGHT), 5)
+    # Grid lines and frame
+    surface.blit(cache.overlay, cache.board_rect)
+    dirty.append(cache.overlay.get_rect(topleft=cache.board_rect.topleft))
     
     # Draw Vibe Meter - Scaled by frequency, but clamped to 100 max
-    vibe_bar_rect = pygame.Rect(info_x, TOP_LEFT_Y + 120, 40, PLAY_HEIGHT - 120)
+    vibe_bar_rect = cache.vibe_rect
     pygame.draw.rect(surface, GRAY, vibe_bar_rect)
     
     # Render Vibe Level
@@ -82,93 +385,239 @@ def draw_window(surface, engine, vibe_score, high_score):
     # Make color glow more intense as vibe increases
     vibe_color = (int(255 * (v_score_clamped/100)), 0, 255)
     pygame.draw.rect(surface, vibe_color, (vibe_bar_rect.x, vibe_bar_rect.y + vibe_bar_rect.height - fill_h, vibe_bar_rect.width, fill_h))
-    
-    vibe_font = pygame.font.SysFont(FONT_NAME, 25, bold=True)
-    vibe_lbl = vibe_font.render('VIBE', 1, (255, 0, 255))
-    surface.blit(vibe_lbl, (vibe_bar_rect.x - 10, vibe_bar_rect.y - 30))
-    
-    # Legend panel
-    legend_font = pygame.font.SysFont(FONT_NAME, 20)
-    legend_x = TOP_LEFT_X + 20
-    legend_y = TOP_LEFT_Y + PLAY_HEIGHT + 20
-    controls_text = [
-        "CONTROLS",
-        "Arrows / W : Move & Rotate",
-        "P          : Pause",
-        "ESC        : Quit",
-        "AI OPEN    : Slow Time",
-        "AI FIST    : Kinetic Slam"
-    ]
-    for idx, line in enumerate(controls_text):
-        lbl = legend_font.render(line, 1, WHITE if idx > 0 else (0, 255, 255))
-        surface.blit(lbl, (legend_x, legend_y + (idx * 25)))
+    dirty.append(vibe_bar_rect)
+
+    return [rect for rect in dirty if rect]
         
+# Keyboard bindings per player, as replay event codes
+SOLO_KEYS = {pygame.K_LEFT: replay.MOVE_LEFT, pygame.K_RIGHT: replay.MOVE_RIGHT, pygame.K_UP: replay.ROTATE,
+             pygame.K_w: replay.ROTATE, pygame.K_DOWN: replay.SOFT_DROP, pygame.K_BACKSPACE: replay.UNDO}
+PLAYER_KEYS = [
+    {pygame.K_a: replay.MOVE_LEFT, pygame.K_d: replay.MOVE_RIGHT, pygame.K_w: replay.ROTATE,
+     pygame.K_s: replay.SOFT_DROP, pygame.K_q: replay.UNDO},
+    {pygame.K_LEFT: replay.MOVE_LEFT, pygame.K_RIGHT: replay.MOVE_RIGHT, pygame.K_UP: replay.ROTATE,
+     pygame.K_DOWN: replay.SOFT_DROP, pygame.K_BACKSPACE: replay.UNDO},
+]
+
+class Player:
+    """
+    One player's game: engine, input log, undo history, vibe meter and slam debounce, drawn onto
+    `surface` (the window, or its half in split-screen) through `cache`.
+    """
+    def __init__(self, name, keys, surface, cache, audio):
+        self.name = name
+        self.keys = keys
+        self.surface = surface
+        self.cache = cache
+        self.audio = audio
+        self.reset()
+
+    def reset(self):
+        self.engine = TetrisEngine()
+        self.recorder = replay.ReplayRecorder.for_engine(self.engine)
+        self.rewind = RewindBuffer()
+        self.rewind.checkpoint(self.engine)
+        self.tick = 0
+        # Gravity and fist slams, shared with the server and the replayer
+        self.rules = replay.TickRules(TICK_MS)
+        self.vibe_score = self.previous_vibe = 0.0
+        self.interacted = False
+        self.just_died = False
+        # Per-game stats for the leaderboard
+        self.gesture_ticks = Counter()
+        self.frame_ms = 0.0
+        self.frames = 0
+        # Clear any game over banner left on this half
+        self.cache.invalidate()
+
+    def drop(self, lines_cleared):
+        self.rewind.checkpoint(self.engine)
+        if lines_cleared > 0:
+            self.audio.play('clear')
+
+    def handle_key(self, key):
+        """Applies a gameplay key if it is one of this player's. Returns True if it was."""
+        code = self.keys.get(key)
+        if code is None:
+            return False
+        engine = self.engine
+        self.interacted = True
+        self.recorder.record(self.tick, code)
+        if code == replay.MOVE_LEFT:
+            engine.move_piece(-1, 0)
+        elif code == replay.MOVE_RIGHT:
+            engine.move_piece(1, 0)
+        elif code == replay.ROTATE:
+            engine.rotate_piece()
+        elif code == replay.UNDO:
+            # Take back the last locked piece
+            self.rewind.undo(engine)
+        elif code == replay.SOFT_DROP:
+            # Keyboard soft drop
+            self.audio.play('drop')
+            self.drop(engine.move_piece(0, 1))
+        return True
+
+    def step(self, gesture):
+        """Advances this player's game by one simulation tick under `gesture`."""
+        engine = self.engine
+        self.tick += 1
+        self.previous_vibe = self.vibe_score
+        self.recorder.record_gesture(self.tick, gesture)
+        self.gesture_ticks[gesture] += 1
+
+        # Open palm slows the fall, a fresh closed fist hard drops (Kinetic Slam)
+        for code, lines_cleared in self.rules.step(engine, gesture):
+            self.recorder.record(self.tick, code)
+            self.audio.play('drop')
+            self.drop(lines_cleared)
+
+        # Update Vibe Score
+        if self.interacted and gesture != "NONE":
+            self.vibe_score = min(self.vibe_score + 5.0, 100.0)
+        else:
+            self.vibe_score = max(self.vibe_score - VIBE_DECAY, 0.0)
+        self.interacted = False
+
+    def record(self):
+        """Returns this player's finished game as a leaderboard GameRecord."""
+        engine = self.engine
+        return GameRecord(self.name, engine.score, engine.lines, engine.pieces, self.tick * TICK_MS / 1000,
+                          self.gesture_ticks["OPEN_PALM"], self.gesture_ticks["CLOSED_FIST"],
+                          self.gesture_ticks["THUMB_UP"], self.frame_ms / self.frames if self.frames else None,
+                          self.recorder.seed, time.time())
+
+    def draw(self, high_score, alpha):
+        """Draws this player's half, easing the vibe meter by `alpha`. Returns window dirty rects."""
+        vibe = self.previous_vibe + (self.vibe_score - self.previous_vibe) * alpha
+        rects = draw_window(self.surface, self.engine, vibe, high_score, self.cache)
+        return self.to_window(rects)
+
+    def draw_game_over(self):
+        """Draws the game over banner over this player's board. Returns window dirty rects."""
+        left = self.cache.origin[0]
+        height = self.surface.get_height()
+        go_label = render_text('game_over', 'GAME OVER', (255, 0, 0))
+        rst_label = render_text('restart', 'Press R or Thumb Up to Restart', WHITE)
+        rects = [
+            self.surface.blit(go_label, (left + PLAY_WIDTH / 2 - (go_label.get_width() / 2), height / 2 - 50)),
+            self.surface.blit(rst_label, (left + PLAY_WIDTH / 2 - (rst_label.get_width() / 2), height / 2 + 50)),
+        ]
+        return self.to_window(rects)
+
+    def to_window(self, rects):
+        offset = self.surface.get_abs_offset()
+        return [rect.move(offset) for rect in rects]
+
+def record_finished_games(players, audio, leaderboard, high_score):
+    """
+    Records every game that has ended since the last call, whichever input ended it: replay,
+    leaderboard entry and sounds. Returns the updated high score.
+    """
+    for player in players:
+        if player.just_died or not player.engine.game_over:
+            continue
+        player.just_died = True
+
+        # Play explosion, stop BGM once nobody is playing
+        if all(other.engine.game_over for other in players):
+            audio.stop_music()
+        audio.play('bomb')
+
+        save_replay(player.recorder, player.engine)
+
+        # Queue the game for the leaderboard; the write happens off the render thread
+        leaderboard.submit(player.record())
+        high_score = max(high_score, player.engine.score)
+    return high_score
+
 def main():
     global WINDOW_WIDTH, WINDOW_HEIGHT, TOP_LEFT_X, TOP_LEFT_Y
     
-    pygame.init()
-    pygame.font.init()
-    pygame.mixer.init() # Init audio
+    # The window comes up first; audio and the vision stack load behind it
+    startup = StartupTimer(STARTED)
+    startup.record('imports', STARTED)
+    with startup.phase('pygame.init'):
+        pygame.init()
+        pygame.font.init()
+        pygame.mixer.init() # Init audio
+    with startup.phase('fonts'):
+        load_fonts()
     
-    # Load sounds
-    try:
-        clear_sound = pygame.mixer.Sound('assets/clear.wav')
-        drop_sound = pygame.mixer.Sound('assets/drop.wav')
-        bomb_sound = pygame.mixer.Sound('assets/bomb.wav')
-        pygame.mixer.music.load('assets/bgm.wav')
-        pygame.mixer.music.set_volume(0.5)
-        if drop_sound: drop_sound.set_volume(0.5)
-        if bomb_sound: bomb_sound.set_volume(0.8)
-        # Start BGM loop
-        pygame.mixer.music.play(-1)
-    except Exception as e:
-        print("Audio load error:", e)
-        clear_sound = None
-        drop_sound = None
-        bomb_sound = None
+    # Effects are filled in by the audio task; until then they are silent
+    audio = AudioManager()
+    audio_task = BackgroundTask('audio', lambda: audio.load(startup), startup)
         
     # Set to Fullscreen
-    infoObject = pygame.display.Info()
-    WINDOW_WIDTH = infoObject.current_w
-    WINDOW_HEIGHT = infoObject.current_h
-    win = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.FULLSCREEN)
-    pygame.display.set_caption('NeonLink: Kinetic Core')
+    with startup.phase('window'):
+        infoObject = pygame.display.Info()
+        WINDOW_WIDTH = infoObject.current_w
+        WINDOW_HEIGHT = infoObject.current_h
+        win = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.FULLSCREEN)
+        pygame.display.set_caption('NeonLink: Kinetic Core')
     
     # Dynamically center the play area
     TOP_LEFT_X = (WINDOW_WIDTH - PLAY_WIDTH) // 2
     TOP_LEFT_Y = WINDOW_HEIGHT - PLAY_HEIGHT - 50
     
-    engine = TetrisEngine()
+    if PLAYERS == 1:
+        players = [Player(PLAYER_NAMES[0] or 'P1', SOLO_KEYS, win, get_render_cache(win), audio)]
+    else:
+        # Split-screen: each player gets a half of the window with its own cached layers
+        half_w = WINDOW_WIDTH // PLAYERS
+        players = []
+        for index in range(PLAYERS):
+            half = win.subsurface((index * half_w, 0, half_w, WINDOW_HEIGHT))
+            cache = RenderCache(half.get_size(), ((half_w - PLAY_WIDTH) // 2, TOP_LEFT_Y),
+                                f'PLAYER {index + 1}', PLAYER_CONTROLS_TEXT[index])
+            players.append(Player(PLAYER_NAMES[index] or f'P{index + 1}', PLAYER_KEYS[index], half, cache, audio))
     clock = pygame.time.Clock()
     
-    # Load High Score
-    try:
-        with open('assets/highscore.txt', 'r') as f:
-            high_score = int(f.read())
-    except:
-        high_score = 0
-        
-    # Base mechanics
-    fall_time = 0
-    base_fall_speed = 0.5  # time in seconds
-    vibe_score = 0.0
+    # Finished games are written to the leaderboard by its own thread; the best score is kept in memory
+    with startup.phase('leaderboard'):
+        leaderboard = Leaderboard()
+        high_score = leaderboard.best_score()
     
-    # Initialize Camera
-    tracker = HandTracker()
-    print("Starting AI Camera...")
-    tracker.start()
+    # Frame phase timings, shown with F3
+    profiler = FrameProfiler()
+    show_profile = False
+    profile_version = 0
+    next_profile_refresh = 0
     
-    # Slam debounce tracking
-    fist_released = True
+    # Initialize Camera in the background; gesture control switches on once it is ready
+    ghost_w, ghost_h = 240, 180
+    tracker = PendingTracker(PLAYERS)
+    vision = BackgroundTask('vision', lambda: start_tracker((ghost_w, ghost_h), profiler, startup), startup)
+    first_frame_shown = startup_reported = False
+    
+    # The tracker publishes previews already scaled and in RGB; they are blitted into this surface
+    preview_surface = pygame.Surface((ghost_w, ghost_h))
+    preview_seq = 0
+    # Top right, or top centre between the two halves
+    gw_x = WINDOW_WIDTH - ghost_w - 20 if PLAYERS == 1 else (WINDOW_WIDTH - ghost_w) // 2
+    gw_y = 60
     
     is_paused = False
     
+    # Simulation runs in fixed ticks; the accumulator holds real time not yet simulated
+    accumulator = 0.0
+    was_idle = False
+    
     run = True
     while run:
-        player_interacted = False
+        # Caps the frame rate, sleeping off the rest of the frame instead of spinning
+        frame_ms = clock.tick(FPS_CAP)
+        profiler.begin_frame()
+        
+        # Switch to gesture control once the background load has finished
+        if vision is not None and vision.ready():
+            if vision.result is not None:
+                tracker = vision.result
+            vision = None
         
         # 1. Update Fall Speed based on AI
-        frame, gesture = tracker.get_data()
+        gestures = tracker.get_gestures()
+        profiler.lap('tracker')
         
         # Handle Input Events first to catch Quit and Pause immediately
         for event in pygame.event.get():
@@ -179,163 +628,169 @@ def main():
                     run = False
                 elif event.key == pygame.K_p:
                     is_paused = not is_paused
+                elif event.key == pygame.K_F3:
+                    show_profile = not show_profile
+                    # Repaint to clear the overlay
+                    for player in players:
+                        player.cache.invalidate()
                 # Allow restart via R key when game over
-                elif engine.game_over and event.key == pygame.K_r:
-                    engine = TetrisEngine()
-                    fall_time = 0
-                    vibe_score = 0.0
-                    fist_released = True
-                    # Re-start BGM
-                    pygame.mixer.music.play(-1)
+                elif event.key == pygame.K_r and any(player.engine.game_over for player in players):
+                    # A key earlier in this batch may have ended the game; record it before the reset
+                    high_score = record_finished_games(players, audio, leaderboard, high_score)
+                    # Re-start BGM if every game had ended
+                    if all(player.engine.game_over for player in players):
+                        audio.play_music()
+                    for player in players:
+                        if player.engine.game_over:
+                            player.reset()
                 
                 # Gameplay controls
-                elif not engine.game_over and not is_paused:
-                    player_interacted = True
-                    if event.key == pygame.K_LEFT:
-                        engine.move_piece(-1, 0)
-                    elif event.key == pygame.K_RIGHT:
-                        engine.move_piece(1, 0)
-                    elif event.key in [pygame.K_UP, pygame.K_w]:
-                        engine.rotate_piece()
-                    elif event.key == pygame.K_DOWN:
-                        # Keyboard soft drop
-                        if drop_sound: drop_sound.play()
-                        lines_cleared = engine.move_piece(0, 1)
-                        if lines_cleared > 0 and clear_sound:
-                            clear_sound.play()
+                elif not is_paused:
+                    for player in players:
+                        if not player.engine.game_over and player.handle_key(event.key):
+                            break
+        # A soft drop can end a game here, before the game over screen below skips the frame
+        high_score = record_finished_games(players, audio, leaderboard, high_score)
+        if not run:
+            break
+        profiler.lap('events')
                             
         if is_paused:
             # Render pause screen over current state
-            draw_window(win, engine, vibe_score, high_score)
+            for player in players:
+                player.draw(high_score, 1.0)
             
-            pause_font = pygame.font.SysFont(FONT_NAME, 80, bold=True)
-            pause_lbl = pause_font.render('PAUSED', 1, WHITE)
+            pause_lbl = render_text('pause', 'PAUSED', WHITE)
             win.blit(pause_lbl, (WINDOW_WIDTH / 2 - pause_lbl.get_width() / 2, WINDOW_HEIGHT / 2 - 50))
             
             pygame.display.update()
-            clock.tick()
+            for player in players:
+                player.cache.invalidate()
+            # Nothing moves while paused: sleep until the next key press or window event
+            wait_for_input()
+            was_idle = True
             continue
             
-        current_fall_speed = base_fall_speed
-        
-        # Update fist release state
-        if gesture != "CLOSED_FIST":
-            fist_released = True
-            
-        # Handle Game Over State
-        if engine.game_over:
-            # Check for restart inputs
-            restart = False
-            if gesture == "THUMB_UP":
-                restart = True
-                
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    run = False
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                    run = False
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
-                    restart = True
-                    
-            if restart:
-                # Reset engine
-                engine = TetrisEngine()
-                fall_time = 0
-                vibe_score = 0.0
-                fist_released = True
-            else:
-                # Render Game Over Screen
-                draw_window(win, engine, vibe_score, high_score)
-                font_go = pygame.font.SysFont('comicsans', 80)
-                go_label = font_go.render('GAME OVER', 1, (255, 0, 0))
-                win.blit(go_label, (TOP_LEFT_X + PLAY_WIDTH / 2 - (go_label.get_width() / 2), WINDOW_HEIGHT / 2 - 50))
-                
-                font_rst = pygame.font.SysFont('comicsans', 40)
-                rst_label = font_rst.render('Press R or Thumb Up to Restart', 1, WHITE)
-                win.blit(rst_label, (TOP_LEFT_X + PLAY_WIDTH / 2 - (rst_label.get_width() / 2), WINDOW_HEIGHT / 2 + 50))
-                
-                pygame.display.update()
-                clock.tick()
-                continue
-        
-        # Phase 2 Gesture mapping
-        if gesture == "OPEN_PALM":
-            current_fall_speed *= 2.0  # Slow-motion
-        elif gesture == "CLOSED_FIST" and fist_released:
-            # Trigger Hard Drop (Kinetic Slam)
-            if drop_sound: drop_sound.play()
-            lines_cleared = engine.hard_drop()
-            if lines_cleared > 0 and clear_sound:
-                clear_sound.play()
-            
-            fist_released = False
-            # Reset fall time to avoid double dropping immediately after spawn
-            fall_time = 0
+        # Handle Game Over State: a thumbs-up restarts that player's game
+        for player, gesture in zip(players, gestures):
+            if player.engine.game_over and gesture == "THUMB_UP":
+                player.reset()
+        if all(player.engine.game_over for player in players):
+            # Render Game Over Screen
+            for player in players:
+                player.draw(high_score, 1.0)
+                player.draw_game_over()
             
-        # 2. Handle Tetris Falling
-        fall_time += clock.get_rawtime()
-        clock.tick()
+            pygame.display.update()
+            for player in players:
+                player.cache.invalidate()
+            # Wake for input, or often enough to notice a thumbs-up restart
+            wait_for_input(IDLE_POLL_MS)
+            was_idle = True
+            continue
         
-        if fall_time / 1000 >= current_fall_speed:
-            fall_time = 0
-            if not engine.game_over:
-                engine.current_piece.y += 1
-                if drop_sound: drop_sound.play()
-                
-                if not engine.valid_space(engine.current_piece) and engine.current_piece.y > 0:
-                    engine.current_piece.y -= 1
-                    lines_cleared = engine.lock_piece()
-                    if lines_cleared > 0 and clear_sound:
-                        clear_sound.play()
-                        
-        # Update Vibe Score
-        if player_interacted and gesture != "NONE":
-            vibe_score = min(vibe_score + 5.0, 100.0)
+        # Time spent paused or on the game over screen is not simulated
+        if was_idle:
+            was_idle = False
+            accumulator = 0.0
         else:
-            vibe_score = max(vibe_score - 0.2, 0.0)
+            accumulator += min(frame_ms, MAX_FRAME_MS)
+        tracker.report_frame_time(clock.get_rawtime())
+        
+        # 2. Advance the simulation in fixed ticks, independent of how long rendering takes
+        while accumulator >= TICK_MS and not all(player.engine.game_over for player in players):
+            accumulator -= TICK_MS
+            for player, gesture in zip(players, gestures):
+                if not player.engine.game_over:
+                    player.step(gesture)
+
+        profiler.lap('update')
 
-        # 4. Render
-        draw_window(win, engine, vibe_score, high_score)
+        # 3. Render, easing the vibe meter between the last two ticks
+        alpha = min(accumulator / TICK_MS, 1.0)
+        dirty_rects = []
+        for player in players:
+            dirty_rects.extend(player.draw(high_score, alpha))
+            if not player.engine.game_over:
+                player.frame_ms += frame_ms
+                player.frames += 1
+            else:
+                # The other player is still going
+                dirty_rects.extend(player.draw_game_over())
+        profiler.lap('draw')
         
         # Display Ghost Window (Moved higher so it doesn't overlap text)
-        ghost_w, ghost_h = 240, 180
-        if frame is not None:
-            # OpenCV to Pygame
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frame_pyg = pygame.surfarray.make_surface(np.swapaxes(frame_rgb, 0, 1))
-            
-            # Scale down
-            frame_pyg = pygame.transform.scale(frame_pyg, (ghost_w, ghost_h))
+        preview = tracker.get_preview(preview_seq)
+        if preview is not None:
+            # Only new camera frames are copied, straight into the reused surface
+            preview_seq, preview_rgb = preview
+            pygame.surfarray.blit_array(preview_surface, np.swapaxes(preview_rgb, 0, 1))
             
-            # Draw with neon border - align to Top Right
-            gw_x = WINDOW_WIDTH - ghost_w - 20
-            gw_y = 60
+        if preview_seq:
+            # Draw with neon border
             pygame.draw.rect(win, (255, 0, 255), (gw_x - 2, gw_y - 2, ghost_w + 4, ghost_h + 4), 2)
-            win.blit(frame_pyg, (gw_x, gw_y))
+            win.blit(preview_surface, (gw_x, gw_y))
+            dirty_rects.append(pygame.Rect(gw_x - 2, gw_y - 2, ghost_w + 4, ghost_h + 4))
+        profiler.lap('preview')
         
-        # Display Gesture Info - positioned right under Ghost Camera
-        gesture_font = pygame.font.SysFont(FONT_NAME, 25, bold=True)
-        gesture_lbl = gesture_font.render(f'AI: {gesture}', 1, (0, 255, 0) if gesture != "NONE" else WHITE)
-        win.blit(gesture_lbl, (WINDOW_WIDTH - ghost_w - 20, 250))
+        # Display Gesture Info - under the Ghost Camera, or above each player's board
+        for player, gesture in zip(players, gestures):
+            if PLAYERS == 1:
+                pos = (WINDOW_WIDTH - ghost_w - 20, 250)
+            else:
+                pos = (player.cache.origin[0], player.cache.origin[1] - 40)
+            label = gesture if vision is None else 'LOADING'
+            gesture_rect = player.cache.blit_label(player.surface, 'gesture', label,
+                                                   lambda: render_text('hud', f'AI: {label}', (0, 255, 0) if label != "NONE" else WHITE),
+                                                   pos)
+            if gesture_rect:
+                dirty_rects.extend(player.to_window([gesture_rect]))
         
-        # End Game Label (Handle high score save on death trigger)
-        if getattr(engine, 'just_died', False) == False and engine.game_over:
-            engine.just_died = True
+        # End Game (Handle high score save on death trigger)
+        high_score = record_finished_games(players, audio, leaderboard, high_score)
             
-            # Play explosion, stop BGM
-            pygame.mixer.music.stop()
-            if bomb_sound:
-                bomb_sound.play()
-                
-            # Save high score
-            if engine.score > high_score:
-                high_score = engine.score
-                with open('assets/highscore.txt', 'w') as f:
-                    f.write(str(engine.score))
+        if show_profile:
+            # Percentiles are recomputed a couple of times a second, not every frame
+            now = pygame.time.get_ticks()
+            if now >= next_profile_refresh:
+                next_profile_refresh = now + PROFILE_REFRESH_MS
+                profile_version += 1
+                profile_summary = profiler.summary()
+                profile_tracker = tracker.get_stats()
+            # Player 1's surface starts at the window's origin
+            profile_rect = players[0].cache.blit_label(players[0].surface, 'profiler', profile_version,
+                                                       lambda: render_profile_panel(profile_summary, profile_tracker), (10, 10))
+            if profile_rect:
+                dirty_rects.append(profile_rect)
+        profiler.lap('hud')
             
-        pygame.display.update()
+        # Only push the regions that changed this frame
+        pygame.display.update(dirty_rects)
+        profiler.lap('display')
+        profiler.end_frame()
+
+        if not first_frame_shown:
+            first_frame_shown = True
+            startup.mark('first_frame')
+        elif not startup_reported and vision is None and audio_task.ready():
+            print(startup.report())
+            startup_reported = True
+
+    # Keep the log of a game that was still in progress
+    for player in players:
+        if not player.engine.game_over and player.recorder.count:
+            save_replay(player.recorder, player.engine)
 
+    if vision is not None and vision.wait(5) and vision.result is not None:
+        # Quit while the camera was still starting
+        tracker = vision.result
     tracker.stop()
+    leaderboard.close()
+    if PROFILE_EXPORT:
+        try:
+            profiler.export(PROFILE_EXPORT)
+        except OSError as e:
+            print("Profile export error:", e)
     pygame.quit()
 
 if __name__ == '__main__':
@@ -0,0 +1,61 @@
+import numpy as np
+
+GESTURES = ["NONE", "OPEN_PALM", "CLOSED_FIST", "THUMB_UP"]
+NONE, OPEN_PALM, CLOSED_FIST, THUMB_UP = range(len(GESTURES))
+
+FINGER_TIPS = [4, 8, 12, 16, 20]  # Thumb, Index, Middle, Ring, Pinky
+FINGER_PIPS = [3, 6, 10, 14, 18]  # IP for thumb, PIP for others
+FINGER_MCPS = [2, 5, 9, 13, 17]   # MCP for base comparison
+
+def landmark_array(hand_landmarks):
+    """Packs a sequence of MediaPipe-style landmarks (objects with x, y, z) into a (21, 3) array."""
+    return np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks], dtype=np.float64)
+
+def classify_gestures(landmarks):
+    """
+    Labels a batch of hands at once. `landmarks` is an (N, 21, 3) array of normalized image
+    coordinates; returns an (N,) array of indices into GESTURES. Same rules as the per-hand
+    classifier: 3+ open fingers is OPEN_PALM, a closed hand is THUMB_UP if the thumb is extended
+    upwards past the index knuckle and CLOSED_FIST otherwise, anything else is NONE.
+    """
+    # Only heights matter; compare in float64 like the per-landmark Python version did
+    y = np.asarray(landmarks)[..., 1].astype(np.float64)
+
+    # A finger is open if its tip is higher (lower y) than its PIP and its PIP higher than its MCP.
+    # Index to pinky landmarks are laid out with a stride of 4, so plain slices pick each joint.
+    tips = y[:, 8:21:4]
+    pips = y[:, 6:19:4]
+    mcps = y[:, 5:18:4]
+    open_count = ((tips < pips) & (pips < mcps)).sum(axis=1)
+
+    # The thumb is up if its tip is above its IP joint and far enough from it to be extended
+    thumb_tip = y[:, FINGER_TIPS[0]]
+    thumb_ip = y[:, FINGER_PIPS[0]]
+    thumb_up = (thumb_ip - thumb_tip > 0.05) & (thumb_tip < y[:, FINGER_MCPS[1]])
+
+    closed = np.where(thumb_up, THUMB_UP, CLOSED_FIST)
+    return np.where(open_count >= 3, OPEN_PALM, np.where(open_count == 0, closed, NONE)).astype(np.uint8)
+
+def gesture_names(labels):
+    """Maps an array of GESTURES indices back to their names."""
+    return np.array(GESTURES)[labels]
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Label a recorded (N, 21, 3) landmark array.")
+    parser.add_argument('landmarks', help=".npy file of recorded landmarks")
+    parser.add_argument('--output', help="write the (N,) GESTURES indices to this .npy file")
+    args = parser.parse_args()
+
+    landmarks = np.load(args.landmarks, mmap_mode='r')
+    start = time.perf_counter()
+    labels = classify_gestures(landmarks)
+    elapsed = time.perf_counter() - start
+
+    print(f"Labelled {len(labels):,} frames in {elapsed * 1000:.1f} ms ({len(labels) / max(elapsed, 1e-9):,.0f} frames/sec)")
+    for index, count in enumerate(np.bincount(labels, minlength=len(GESTURES))):
+        print(f"  {GESTURES[index]:12s} {count:,}")
+    if args.output:
+        np.save(args.output, labels)
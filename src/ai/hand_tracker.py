@@ -1,12 +1,93 @@
 import cv2
 import mediapipe as mp
+import numpy as np
 import threading
 import time
 
+from src.ai.gestures import GESTURES, classify_gestures, landmark_array
+from src.ai.quality import QualityController
+from src.ai.sources import CameraSource, FrameSource
+
+class PreviewExchange:
+    """
+    Triple-buffered hand-off of small RGB previews from the tracker thread to the render loop.
+    The writer fills whichever buffer is neither published nor being read and publishes it by
+    bumping a sequence number, so the reader can blit straight out of a buffer without a copy.
+    There must be one writer at a time; HandTracker serializes its publishers.
+    """
+    def __init__(self, size):
+        w, h = size
+        self.size = size
+        self.buffers = [np.zeros((h, w, 3), dtype=np.uint8) for _ in range(3)]
+        self.scratch = np.zeros((h, w, 3), dtype=np.uint8)
+        self.published = 0
+        self.reading = 0
+        self.seq = 0
+        self.lock = threading.Lock()
+
+    def publish(self, img):
+        """Scales a BGR frame down to the preview size, converts it to RGB and publishes it."""
+        with self.lock:
+            busy = (self.published, self.reading)
+        index = next(i for i in range(3) if i not in busy)
+
+        cv2.resize(img, self.size, dst=self.scratch, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(self.scratch, cv2.COLOR_BGR2RGB, dst=self.buffers[index])
+
+        with self.lock:
+            self.published = index
+            self.seq += 1
+
+    def acquire(self, last_seq=0):
+        """
+        Returns (seq, rgb) for the newest preview, or None if nothing newer than `last_seq` exists.
+        `rgb` is a (height, width, 3) buffer that stays untouched until the next acquire, so blit
+        it (e.g. with surfarray.blit_array) rather than keeping it.
+        """
+        with self.lock:
+            if self.seq == last_seq:
+                return None
+            self.reading = self.published
+            return self.seq, self.buffers[self.reading]
+
 class HandTracker:
-    def __init__(self, camera_index=0):
+    """
+    Runs camera capture and hand-landmark inference on two background threads. Capture keeps only
+    the newest frame, so slow inference drops stale frames instead of queueing them. Inference
+    either calls detect_for_video itself ('video') or hands frames to MediaPipe's LIVE_STREAM
+    mode, which delivers results through a callback ('live_stream').
+
+    Frames come from `source` (see src.ai.sources), the webcam by default. Sources that are not
+    realtime apply backpressure instead: capture waits for inference, so no frame is dropped.
+    A QualityController trades inference resolution, frequency and overlay drawing for latency.
+
+    With num_hands=2 one landmarker pass serves two players: every detected hand is classified in
+    one batch and assigned to a player by screen side (left half is player 1) or by the handedness
+    MediaPipe reports ('handedness'). get_gestures() returns one gesture per player.
+    """
+    RUNNING_MODES = ('video', 'live_stream')
+    STAGES = ('capture', 'convert', 'inference', 'gesture', 'publish')
+    ASSIGN_MODES = ('side', 'handedness')
+
+    def __init__(self, camera_index=0, preview_size=(240, 180), running_mode='video', source=None, quality=None, profiler=None,
+                 num_hands=1, assign='side'):
+        if running_mode not in self.RUNNING_MODES:
+            raise ValueError(f"Unknown running mode: {running_mode}")
+        if assign not in self.ASSIGN_MODES:
+            raise ValueError(f"Unknown hand assignment: {assign}")
+        if source is not None and not isinstance(source, FrameSource):
+            # e.g. a LandmarkSource, whose hands go through run_landmarks instead
+            raise TypeError(f"HandTracker needs a FrameSource, not {type(source).__name__}")
         self.camera_index = camera_index
-        self.cap = None
+        self.preview_size = preview_size
+        self.running_mode = running_mode
+        self.source = source if source is not None else CameraSource(camera_index)
+        self.quality = quality if quality is not None else QualityController()
+        # Optional FrameProfiler that receives every stage sample as 'tracker.<stage>'
+        self.profiler = profiler
+        self.last_hands = []
+        self.num_hands = num_hands
+        self.assign = assign
         
         # MediaPipe Tasks API setup
         BaseOptions = mp.tasks.BaseOptions
@@ -14,130 +95,308 @@ class HandTracker:
         HandLandmarkerOptions = mp.tasks.vision.HandLandmarkerOptions
         VisionRunningMode = mp.tasks.vision.RunningMode
 
-        options = HandLandmarkerOptions(
-            base_options=BaseOptions(model_asset_path='assets/hand_landmarker.task'),
-            running_mode=VisionRunningMode.VIDEO,
-            num_hands=1)
+        if running_mode == 'live_stream':
+            options = HandLandmarkerOptions(
+                base_options=BaseOptions(model_asset_path='assets/hand_landmarker.task'),
+                running_mode=VisionRunningMode.LIVE_STREAM,
+                num_hands=num_hands,
+                result_callback=self._on_async_result)
+        else:
+            options = HandLandmarkerOptions(
+                base_options=BaseOptions(model_asset_path='assets/hand_landmarker.task'),
+                running_mode=VisionRunningMode.VIDEO,
+                num_hands=num_hands)
             
         self.landmarker = self.HandLandmarker.create_from_options(options)
         
         self.running = False
-        self.thread = None
+        self.capture_thread = None
+        self.inference_thread = None
         self.current_frame = None
         self.current_gesture = "NONE"
+        # One gesture per player, indexed by player
+        self.player_gestures = ["NONE"] * num_hands
         
         # Thread safety lock
         self.lock = threading.Lock()
+        # In live_stream mode both the inference thread (skipped frames) and MediaPipe's callback
+        # thread publish, so writers take this lock around the whole publish
+        self.publish_lock = threading.Lock()
+        self.preview = PreviewExchange(preview_size)
+
+        # Latest-frame slot between the capture and inference threads
+        self.frame_ready = threading.Condition()
+        self.stop_event = threading.Event()
+        self.drained = threading.Event()
+        self.latest_frame = None
+        self.latest_frame_id = 0
+        self.source_done = False
+        self.latest_frame_time = 0.0
+        self.last_timestamp_ms = 0
+        # LIVE_STREAM frames awaiting their result callback: timestamp -> (img, captured_at, submitted_at)
+        self.pending = {}
+
+        # Pipeline statistics
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.frames_inferred = 0
+        self.frames_skipped = 0
+        self.latency_ms = 0.0
+        # Moving average of milliseconds spent per frame in each pipeline stage
+        self.stage_ms = dict.fromkeys(self.STAGES, 0.0)
         
     def start(self):
-        """Starts the camera feed and gesture recognition in a background thread."""
-        self.cap = cv2.VideoCapture(self.camera_index)
-        if not self.cap.isOpened():
-            print(f"Error: Could not open camera {self.camera_index}.")
+        """Starts the frame source and gesture recognition in background threads."""
+        if not self.source.open():
             return False
             
         self.running = True
-        self.thread = threading.Thread(target=self._update, daemon=True)
-        self.thread.start()
+        self.stop_event.clear()
+        self.drained.clear()
+        self.source_done = False
+        self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.inference_thread = threading.Thread(target=self._inference_loop, daemon=True)
+        self.capture_thread.start()
+        self.inference_thread.start()
         return True
         
     def stop(self):
-        """Stops the background thread and releases the camera."""
+        """Stops the background threads and releases the frame source."""
         self.running = False
-        if self.thread:
-            self.thread.join()
-        if self.cap:
-            self.cap.release()
+        self.stop_event.set()
+        with self.frame_ready:
+            self.frame_ready.notify_all()
+        for thread in (self.capture_thread, self.inference_thread):
+            if thread:
+                thread.join()
+        self.source.close()
+
+    def wait_until_drained(self, timeout=None):
+        """Blocks until a finite source has been read to the end and every frame processed."""
+        if not self.drained.wait(timeout):
+            return False
+        # LIVE_STREAM results may still be in flight on MediaPipe's thread
+        while self.pending:
+            time.sleep(0.001)
+        return True
+
+    def _time_stage(self, stage, started):
+        elapsed = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.stage_ms[stage] += (elapsed - self.stage_ms[stage]) * 0.1
+        if self.profiler is not None:
+            self.profiler.record('tracker.' + stage, elapsed)
+        return elapsed
             
-    def _update(self):
-        """The loop running in the background thread."""
+    def _capture_loop(self):
+        """Capture stage: reads frames as fast as the source delivers them, keeping only the newest."""
         while self.running:
-            success, img = self.cap.read()
+            started = time.perf_counter()
+            success, img = self.source.read()
             if not success:
-                time.sleep(0.1)
+                if self.source.exhausted:
+                    with self.frame_ready:
+                        self.source_done = True
+                        self.frame_ready.notify()
+                    break
+                # Wait for the camera to recover, waking immediately on stop()
+                self.stop_event.wait(0.1)
                 continue
                 
             # Flip image horizontally for natural (mirror) viewing
             img = cv2.flip(img, 1)
+            self._time_stage('capture', started)
             
-            # Convert BGR to RGB for mediapipe
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            with self.frame_ready:
+                if not self.source.realtime:
+                    # Benchmark/replay sources: wait for inference rather than dropping frames
+                    while self.running and self.latest_frame is not None:
+                        self.frame_ready.wait()
+                if self.latest_frame is not None:
+                    # Inference never picked up the previous frame
+                    self.frames_dropped += 1
+                self.latest_frame = img
+                self.latest_frame_id += 1
+                self.latest_frame_time = time.perf_counter()
+                self.frames_captured += 1
+                self.frame_ready.notify_all()
+
+    def _inference_loop(self):
+        """Inference stage: sleeps until a new frame arrives, then runs the landmarker on it."""
+        while self.running:
+            with self.frame_ready:
+                while self.running and self.latest_frame is None and not self.source_done:
+                    self.frame_ready.wait()
+                if not self.running:
+                    break
+                if self.latest_frame is None:
+                    self.drained.set()
+                    break
+                img = self.latest_frame
+                captured_at = self.latest_frame_time
+                self.latest_frame = None
+                self.frame_ready.notify_all()
+
+            level = self.quality.level()
+            if self.quality.should_skip():
+                # The gesture is steady: reuse the last landmarks instead of running inference
+                with self.lock:
+                    self.frames_skipped += 1
+                if level.draw_landmarks:
+                    self._draw_landmarks(img, self.last_hands)
+                self._publish(img, list(self.player_gestures), captured_at)
+                continue
+                
+            # Convert BGR to RGB for mediapipe, downscaled first when quality is reduced
+            started = time.perf_counter()
+            if level.scale < 1.0:
+                img_rgb = cv2.resize(img, None, fx=level.scale, fy=level.scale, interpolation=cv2.INTER_LINEAR)
+                cv2.cvtColor(img_rgb, cv2.COLOR_BGR2RGB, dst=img_rgb)
+            else:
+                img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
             mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=img_rgb)
+            self._time_stage('convert', started)
             
-            # Milliseconds timestamp
-            frame_timestamp_ms = int(time.time() * 1000)
+            # Milliseconds timestamp; MediaPipe requires them to strictly increase
+            frame_timestamp_ms = max(int(time.time() * 1000), self.last_timestamp_ms + 1)
+            self.last_timestamp_ms = frame_timestamp_ms
             
+            started = time.perf_counter()
             try:
+                if self.running_mode == 'live_stream':
+                    # Inference is timed when the result arrives, from this submission
+                    with self.lock:
+                        self.pending[frame_timestamp_ms] = (img, captured_at, started)
+                    self.landmarker.detect_async(mp_image, frame_timestamp_ms)
+                    continue
                 results = self.landmarker.detect_for_video(mp_image, frame_timestamp_ms)
             except Exception as e:
-                time.sleep(0.01)
+                with self.lock:
+                    self.pending.pop(frame_timestamp_ms, None)
                 continue
+            self._time_stage('inference', started)
             
-            gesture = "NONE"
-            
-            if results.hand_landmarks:
-                for hand_lms in results.hand_landmarks:
-                    # Draw manual landmarks (cyan color)
-                    for lm in hand_lms:
-                        x, y = int(lm.x * img.shape[1]), int(lm.y * img.shape[0])
-                        cv2.circle(img, (x, y), 4, (255, 255, 0), -1)
-                    
-                    gesture = self._detect_gesture(hand_lms)
-            
+            self._handle_result(img, results, captured_at)
+
+    def _on_async_result(self, results, output_image, timestamp_ms):
+        """LIVE_STREAM result callback, invoked on MediaPipe's own thread."""
+        with self.lock:
+            entry = self.pending.get(timestamp_ms)
+            # Older frames were skipped by MediaPipe while it was busy
+            for stale in [ts for ts in self.pending if ts < timestamp_ms]:
+                del self.pending[stale]
+        if entry is None:
+            return
+        img, captured_at, submitted_at = entry
+        self._time_stage('inference', submitted_at)
+        try:
+            self._handle_result(img, results, captured_at)
+        finally:
+            # Only now is the frame done, so wait_until_drained sees it published
+            with self.lock:
+                self.pending.pop(timestamp_ms, None)
+
+    def _draw_landmarks(self, img, hands):
+        # Landmarks are normalized, so they map onto the full-size frame at any inference scale
+        for hand_lms in hands:
+            # Draw manual landmarks (cyan color)
+            for lm in hand_lms:
+                x, y = int(lm.x * img.shape[1]), int(lm.y * img.shape[0])
+                cv2.circle(img, (x, y), 4, (255, 255, 0), -1)
+
+    def _handle_result(self, img, results, captured_at):
+        """Draws landmarks, classifies every hand in one batch and publishes the frame and gestures."""
+        started = time.perf_counter()
+        
+        hands = results.hand_landmarks or []
+        if hands and self.quality.level().draw_landmarks:
+            self._draw_landmarks(img, hands)
+        gestures = ["NONE"] * self.num_hands
+        if hands:
+            labels = classify_gestures(np.stack([landmark_array(h) for h in hands]))
+            if self.num_hands == 1:
+                gestures[0] = GESTURES[labels[-1]]
+            else:
+                for player, label in zip(self._assign_players(hands, results), labels):
+                    gestures[player] = GESTURES[label]
+        self.last_hands = hands
+        with self.lock:
+            self.frames_inferred += 1
+        self._time_stage('gesture', started)
+        
+        started = time.perf_counter()
+        self._publish(img, gestures, captured_at)
+        self._time_stage('publish', started)
+        self.quality.observe(tuple(gestures), (time.perf_counter() - captured_at) * 1000, self.stage_ms['inference'])
+
+    def _assign_players(self, hands, results):
+        """Returns the player index for each detected hand."""
+        # Wrist x in the mirrored frame, so the left half of the preview is player 0
+        wrists = [h[0].x for h in hands]
+        if self.assign == 'handedness' and results.handedness:
+            # Handedness assumes a mirrored selfie image, which the capture stage produces
+            players = [0 if h and h[0].category_name == 'Left' else 1 for h in results.handedness]
+            if len(set(players)) == len(players):
+                return players
+        if len(hands) == 1:
+            return [0 if wrists[0] < 0.5 else 1]
+        order = sorted(range(len(hands)), key=wrists.__getitem__)
+        players = [0] * len(hands)
+        for player, i in enumerate(order):
+            players[i] = min(player, self.num_hands - 1)
+        return players
+
+    def report_frame_time(self, frame_ms):
+        """Lets the quality controller see how long the game's frames are taking."""
+        self.quality.report_frame_time(frame_ms)
+
+    def _publish(self, img, gestures, captured_at):
+        """Makes a processed frame and its per-player gestures visible to get_data/get_preview/get_gesture(s)."""
+        with self.publish_lock:
+            self.preview.publish(img)
             with self.lock:
                 self.current_frame = img
-                self.current_gesture = gesture
-                
-            # Sleep slightly to prevent 100% CPU usage
-            time.sleep(0.01)
+                self.current_gesture = gestures[0]
+                self.player_gestures = gestures
+                self.latency_ms = (time.perf_counter() - captured_at) * 1000
+
+    def get_stats(self):
+        """Returns capture/inference counters, the latest capture-to-gesture latency and stage timings."""
+        with self.lock:
+            return {
+                'running_mode': self.running_mode,
+                'frames_captured': self.frames_captured,
+                'frames_dropped': self.frames_dropped,
+                'frames_inferred': self.frames_inferred,
+                'frames_skipped': self.frames_skipped,
+                'latency_ms': self.latency_ms,
+                'quality': self.quality.level().name,
+                'quality_changes': self.quality.changes,
+                'stage_ms': dict(self.stage_ms),
+            }
             
-    def _detect_gesture(self, hand_landmarks):
+    def get_preview(self, last_seq=0):
+        """Returns (seq, rgb) for the newest camera preview, or None if nothing is newer than `last_seq`."""
+        return self.preview.acquire(last_seq)
+
+    def get_gesture(self):
+        """Returns the latest detected gesture without touching the frame."""
+        with self.lock:
+            return self.current_gesture
+
+    def get_gestures(self):
+        """Returns the latest gesture of each player, as a list of num_hands labels."""
+        with self.lock:
+            return list(self.player_gestures)
+
+    @staticmethod
+    def _detect_gesture(hand_landmarks):
         """
         Determines if the hand is OPEN_PALM, CLOSED_FIST, or THUMB_UP based on finger landmarks.
+        Needs no tracker, so recorded landmarks can be classified without building the model.
         """
-        finger_tips = [4, 8, 12, 16, 20] # Thumb, Index, Middle, Ring, Pinky
-        finger_pips = [3, 6, 10, 14, 18] # IP for thumb, PIP for others
-        finger_mcps = [2, 5, 9, 13, 17]  # MCP for base comparison
-        
-        # Check fingers 1 to 4 (Index to Pinky)
-        fingers_open = []
-        for i in range(1, 5):
-            # A finger is open if its tip is significantly higher (lower y) than its PIP
-            # AND its PIP is higher than its MCP
-            tip_y = hand_landmarks[finger_tips[i]].y
-            pip_y = hand_landmarks[finger_pips[i]].y
-            mcp_y = hand_landmarks[finger_mcps[i]].y
-            
-            is_open = tip_y < pip_y and pip_y < mcp_y
-            fingers_open.append(is_open)
-            
-        open_count = sum(fingers_open)
-        
-        # Thumb Logic:
-        # A thumb is "up" if its tip is higher than its IP joint.
-        thumb_tip_y = hand_landmarks[finger_tips[0]].y
-        thumb_ip_y = hand_landmarks[finger_pips[0]].y
-        thumb_mcp_y = hand_landmarks[finger_mcps[0]].y
-        
-        # Also ensure the thumb is actually extended (distance between tip and mcp is large enough)
-        thumb_extended = abs(thumb_tip_y - thumb_ip_y) > 0.05
-        thumb_is_up = thumb_tip_y < thumb_ip_y and thumb_extended
-
-        if open_count >= 3:
-            return "OPEN_PALM"
-            
-        if open_count == 0:
-            # If all 4 fingers are closed, we check the thumb to distinguish FIST vs THUMB_UP
-            # For a fist, the thumb is usually tucked in (y distance is very small between tip and IP)
-            # or pointing somewhat sideways/downwards.
-            
-            # If the thumb is definitively pointing up and extended
-            if thumb_is_up and thumb_tip_y < hand_landmarks[finger_mcps[1]].y:
-                return "THUMB_UP"
-                
-            return "CLOSED_FIST"
-            
-        return "NONE"
+        labels = classify_gestures(landmark_array(hand_landmarks)[np.newaxis])
+        return GESTURES[labels[0]]
         
     def get_data(self):
         """Returns the latest frame and detected gesture safely."""
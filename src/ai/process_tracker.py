@@ -0,0 +1,287 @@
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.ai.gestures import GESTURES
+from src.ai.quality import QUALITY_LEVELS
+
+# Control block layout (int64 slots). Slots ending in _SEQ are sequence counters: the writer makes
+# them odd while it updates the data they guard and even again when done, so readers never lock.
+CTL_SEQ = 0             # guards the gesture/stats slots below
+CTL_GESTURE = 1
+CTL_PUBLISHED = 2       # preview buffer holding the newest frame
+CTL_PREVIEW_COUNT = 3
+CTL_CAPTURED = 4
+CTL_DROPPED = 5
+CTL_INFERRED = 6
+CTL_LATENCY_US = 7
+CTL_BUFFER_SEQ = 8      # three slots, one per preview buffer
+CTL_FRAME_SEQ = 11      # guards the full-size frame
+CTL_STATUS = 12         # 1 once the camera is open, -1 if it failed
+CTL_QUALITY = 13        # index into QUALITY_LEVELS
+CTL_SKIPPED = 14
+CTL_FRAME_US = 15       # the game's latest frame time, written by the parent
+CTL_STAGE_US = 16       # latest sample of each tracker stage, one slot per STAGES entry
+CTL_PLAYER_GESTURE = 21 # one slot per player, up to MAX_PLAYERS
+MAX_PLAYERS = 2
+CTL_READING = 23        # preview buffer the parent is copying, written by the parent
+CTL_QUALITY_CHANGES = 24
+CTL_SLOTS = 25
+
+# Same order as HandTracker.STAGES
+STAGES = ('capture', 'convert', 'inference', 'gesture', 'publish')
+
+def _read_consistent(seq, read, retries=100):
+    """Runs `read()` until it completes without the guarding sequence counter changing."""
+    for _ in range(retries):
+        before = int(seq())
+        if before & 1:
+            continue
+        value = read()
+        if int(seq()) == before:
+            return value
+    return None
+
+class _SharedBlocks:
+    """The shared-memory segments used by a ProcessHandTracker and its child process."""
+    def __init__(self, preview_size, frame_size, names=None):
+        pw, ph = preview_size
+        fw, fh = frame_size
+        sizes = (CTL_SLOTS * 8, 3 * ph * pw * 3, fh * fw * 3)
+        if names is None:
+            self.segments = [shared_memory.SharedMemory(create=True, size=size) for size in sizes]
+        else:
+            self.segments = [shared_memory.SharedMemory(name=name) for name in names]
+        self.names = [segment.name for segment in self.segments]
+
+        self.ctl = np.ndarray((CTL_SLOTS,), dtype=np.int64, buffer=self.segments[0].buf)
+        self.previews = np.ndarray((3, ph, pw, 3), dtype=np.uint8, buffer=self.segments[1].buf)
+        self.frame = np.ndarray((fh, fw, 3), dtype=np.uint8, buffer=self.segments[2].buf)
+        if names is None:
+            self.ctl[:] = 0
+
+    def close(self, unlink=False):
+        # Drop the numpy views before closing the mappings they point into
+        del self.ctl, self.previews, self.frame
+        for segment in self.segments:
+            segment.close()
+            if unlink:
+                segment.unlink()
+
+def _tracker_process(names, camera_index, preview_size, frame_size, running_mode, num_hands, ready, stop_event):
+    """Child process entry point: runs a HandTracker and mirrors its output into shared memory."""
+    # The vision stack is only loaded here, keeping OpenCV and MediaPipe out of the game process
+    import cv2
+    from src.ai.hand_tracker import HandTracker
+
+    blocks = _SharedBlocks(preview_size, frame_size, names)
+    ctl = blocks.ctl
+
+    class SharedMemoryTracker(HandTracker):
+        def _time_stage(self, stage, started):
+            elapsed = super()._time_stage(stage, started)
+            ctl[CTL_STAGE_US + STAGES.index(stage)] = int(elapsed * 1000)
+            return elapsed
+
+        def _publish(self, img, gestures, captured_at):
+            # Results can arrive from the inference thread or MediaPipe's callback thread
+            with self.publish_lock:
+                # Triple buffering: skip the newest preview and the one the parent is copying
+                busy = (ctl[CTL_PUBLISHED], ctl[CTL_READING])
+                index = next(i for i in range(3) if i not in busy)
+                ctl[CTL_BUFFER_SEQ + index] += 1
+                small = cv2.resize(img, preview_size, interpolation=cv2.INTER_LINEAR)
+                cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=blocks.previews[index])
+                ctl[CTL_BUFFER_SEQ + index] += 1
+
+                ctl[CTL_FRAME_SEQ] += 1
+                if img.shape[1::-1] == tuple(frame_size):
+                    np.copyto(blocks.frame, img)
+                else:
+                    cv2.resize(img, frame_size, dst=blocks.frame, interpolation=cv2.INTER_LINEAR)
+                ctl[CTL_FRAME_SEQ] += 1
+
+                ctl[CTL_SEQ] += 1
+                ctl[CTL_GESTURE] = GESTURES.index(gestures[0])
+                for player, gesture in enumerate(gestures):
+                    ctl[CTL_PLAYER_GESTURE + player] = GESTURES.index(gesture)
+                ctl[CTL_PUBLISHED] = index
+                ctl[CTL_PREVIEW_COUNT] += 1
+                ctl[CTL_CAPTURED] = self.frames_captured
+                ctl[CTL_DROPPED] = self.frames_dropped
+                ctl[CTL_INFERRED] = self.frames_inferred
+                ctl[CTL_SKIPPED] = self.frames_skipped
+                ctl[CTL_QUALITY] = self.quality.index
+                ctl[CTL_QUALITY_CHANGES] = self.quality.changes
+                ctl[CTL_LATENCY_US] = int((time.perf_counter() - captured_at) * 1e6)
+                ctl[CTL_SEQ] += 1
+                # Frames that skip inference republish these
+                with self.lock:
+                    self.current_gesture = gestures[0]
+                    self.player_gestures = gestures
+
+    tracker = None
+    try:
+        tracker = SharedMemoryTracker(camera_index, preview_size, running_mode, num_hands=num_hands)
+        ctl[CTL_STATUS] = 1 if tracker.start() else -1
+    except Exception as e:
+        print("Tracker process error:", e)
+        ctl[CTL_STATUS] = -1
+    ready.set()
+
+    if ctl[CTL_STATUS] == 1:
+        # Pass the game's frame time on to the quality controller until asked to stop
+        while not stop_event.wait(0.1):
+            tracker.report_frame_time(ctl[CTL_FRAME_US] / 1000)
+        tracker.stop()
+    blocks.close()
+
+class ProcessHandTracker:
+    """
+    HandTracker running in a child process, so MediaPipe inference and OpenCV work never contend
+    for the game loop's GIL. Frames come back through shared memory and gestures through a
+    sequence-counter slot. Offers the same start/stop/get_data/get_gesture/get_preview interface.
+    """
+    def __init__(self, camera_index=0, preview_size=(240, 180), running_mode='video',
+                 frame_size=(640, 480), startup_timeout=15.0, profiler=None, num_hands=1):
+        if not 1 <= num_hands <= MAX_PLAYERS:
+            raise ValueError(f"num_hands must be between 1 and {MAX_PLAYERS}")
+        self.camera_index = camera_index
+        self.num_hands = num_hands
+        self.preview_size = preview_size
+        self.running_mode = running_mode
+        self.frame_size = frame_size
+        self.startup_timeout = startup_timeout
+        # Stage samples from the child are copied into this FrameProfiler as they are published
+        self.profiler = profiler
+        self.profiled_frames = 0
+
+        # Spawn rather than fork: the parent holds SDL and camera threads that must not be copied
+        self.context = multiprocessing.get_context('spawn')
+        self.process = None
+        self.blocks = None
+        self.stop_event = None
+
+        pw, ph = preview_size
+        self.preview_copy = np.zeros((ph, pw, 3), dtype=np.uint8)
+
+    def start(self):
+        """Starts the tracker process. Returns False if the camera could not be opened."""
+        self.blocks = _SharedBlocks(self.preview_size, self.frame_size)
+        ready = self.context.Event()
+        self.stop_event = self.context.Event()
+        self.process = self.context.Process(
+            target=_tracker_process,
+            args=(self.blocks.names, self.camera_index, self.preview_size, self.frame_size,
+                  self.running_mode, self.num_hands, ready, self.stop_event),
+            daemon=True)
+        self.process.start()
+
+        if not ready.wait(self.startup_timeout) or self.blocks.ctl[CTL_STATUS] != 1:
+            print(f"Error: Tracker process could not open camera {self.camera_index}.")
+            self.stop()
+            return False
+        return True
+
+    def stop(self):
+        """Stops the child process and releases the shared memory."""
+        if self.stop_event:
+            self.stop_event.set()
+        if self.process:
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+        if self.blocks:
+            self.blocks.close(unlink=True)
+            self.blocks = None
+
+    def _control(self):
+        ctl = self.blocks.ctl
+        return _read_consistent(lambda: ctl[CTL_SEQ], ctl.copy)
+
+    def _profile(self, control):
+        """Copies the child's stage samples into the profiler once per newly inferred frame."""
+        if self.profiler is not None and control[CTL_INFERRED] != self.profiled_frames:
+            self.profiled_frames = int(control[CTL_INFERRED])
+            for i, stage in enumerate(STAGES):
+                self.profiler.record('tracker.' + stage, int(control[CTL_STAGE_US + i]) / 1000)
+
+    def report_frame_time(self, frame_ms):
+        if self.blocks is not None:
+            self.blocks.ctl[CTL_FRAME_US] = int(frame_ms * 1000)
+
+    def get_gesture(self):
+        if self.blocks is None:
+            return "NONE"
+        control = self._control()
+        if control is None:
+            return "NONE"
+        self._profile(control)
+        return GESTURES[control[CTL_GESTURE]]
+
+    def get_gestures(self):
+        """Returns the latest gesture of each player, as a list of num_hands labels."""
+        control = self._control() if self.blocks is not None else None
+        if control is None:
+            return ["NONE"] * self.num_hands
+        self._profile(control)
+        return [GESTURES[control[CTL_PLAYER_GESTURE + player]] for player in range(self.num_hands)]
+
+    def get_preview(self, last_seq=0):
+        """
+        Returns (seq, rgb) for the newest preview, or None if nothing is newer than `last_seq`.
+        `rgb` is a buffer owned by this object and overwritten by the next call.
+        """
+        if self.blocks is None:
+            return None
+        control = self._control()
+        if control is None or control[CTL_PREVIEW_COUNT] == last_seq:
+            return None
+
+        index = control[CTL_PUBLISHED]
+        ctl = self.blocks.ctl
+        # Keeps the writer off this buffer; the sequence counter still catches a write that
+        # started before the child saw this
+        ctl[CTL_READING] = index
+        source = self.blocks.previews[index]
+
+        def copy_preview():
+            np.copyto(self.preview_copy, source)
+            return self.preview_copy
+
+        preview = _read_consistent(lambda: ctl[CTL_BUFFER_SEQ + index], copy_preview)
+        if preview is None:
+            return None
+        return int(control[CTL_PREVIEW_COUNT]), preview
+
+    def get_data(self):
+        """Returns a copy of the latest full-size frame (or None) and the detected gesture."""
+        if self.blocks is None:
+            return None, "NONE"
+        ctl = self.blocks.ctl
+        frame = None
+        if ctl[CTL_PREVIEW_COUNT]:
+            frame = _read_consistent(lambda: ctl[CTL_FRAME_SEQ], self.blocks.frame.copy)
+        return frame, self.get_gesture()
+
+    def get_stats(self):
+        control = self._control() if self.blocks is not None else None
+        if control is None:
+            return {'running_mode': self.running_mode, 'frames_captured': 0, 'frames_dropped': 0,
+                    'frames_inferred': 0, 'frames_skipped': 0, 'latency_ms': 0.0,
+                    'quality': QUALITY_LEVELS[0].name, 'quality_changes': 0,
+                    'stage_ms': dict.fromkeys(STAGES, 0.0)}
+        return {
+            'running_mode': self.running_mode,
+            'frames_captured': int(control[CTL_CAPTURED]),
+            'frames_dropped': int(control[CTL_DROPPED]),
+            'frames_inferred': int(control[CTL_INFERRED]),
+            'frames_skipped': int(control[CTL_SKIPPED]),
+            'latency_ms': int(control[CTL_LATENCY_US]) / 1000,
+            'quality': QUALITY_LEVELS[int(control[CTL_QUALITY])].name,
+            'quality_changes': int(control[CTL_QUALITY_CHANGES]),
+            'stage_ms': {stage: int(control[CTL_STAGE_US + i]) / 1000 for i, stage in enumerate(STAGES)},
+        }
@@ -0,0 +1,83 @@
+from collections import namedtuple
+
+QualityLevel = namedtuple('QualityLevel', ['name', 'scale', 'max_skip', 'draw_landmarks'])
+
+# From best to cheapest: inference input scale, frames that may be skipped between inferences
+# while the gesture is steady, and whether landmarks are drawn onto the preview
+QUALITY_LEVELS = [
+    QualityLevel('full', 1.0, 0, True),
+    QualityLevel('balanced', 0.75, 0, True),
+    QualityLevel('reduced', 0.5, 1, True),
+    QualityLevel('low', 0.5, 2, False),
+    QualityLevel('minimal', 0.35, 3, False),
+]
+
+class QualityController:
+    """
+    Picks the tracker's quality level from measured capture-to-gesture latency and the game's
+    frame time. Sustained overruns of either target step quality down one level; a long stretch
+    of comfortable headroom steps it back up. With adaptive=False it stays at `level`. Level
+    changes are counted in `changes` for the tracker's stats rather than logged.
+    """
+    def __init__(self, target_latency_ms=80.0, frame_budget_ms=1000 / 60, adaptive=True, level=0,
+                 stable_frames=3, strain_frames=10, headroom_frames=90):
+        self.target_latency_ms = target_latency_ms
+        self.frame_budget_ms = frame_budget_ms
+        self.adaptive = adaptive
+        self.index = level
+        self.stable_frames = stable_frames
+        self.strain_frames = strain_frames
+        self.headroom_frames = headroom_frames
+
+        self.latency_ms = 0.0
+        self.inference_ms = 0.0
+        self.frame_ms = 0.0
+        self.strain = 0
+        self.headroom = 0
+        self.last_gesture = None
+        self.same_gesture = 0
+        self.skipped = 0
+        self.changes = 0
+
+    def level(self):
+        return QUALITY_LEVELS[self.index]
+
+    def report_frame_time(self, frame_ms):
+        """Called by the game loop with how long its last frame took."""
+        self.frame_ms += (frame_ms - self.frame_ms) * 0.1
+
+    def should_skip(self):
+        """True if this frame can reuse the last result because the gesture has been steady."""
+        if self.same_gesture >= self.stable_frames and self.skipped < self.level().max_skip:
+            self.skipped += 1
+            return True
+        self.skipped = 0
+        return False
+
+    def observe(self, gesture, latency_ms, inference_ms):
+        """Records one inferred frame and adjusts the quality level if needed."""
+        self.same_gesture = self.same_gesture + 1 if gesture == self.last_gesture else 0
+        self.last_gesture = gesture
+        self.latency_ms += (latency_ms - self.latency_ms) * 0.2
+        self.inference_ms += (inference_ms - self.inference_ms) * 0.2
+        if not self.adaptive:
+            return
+
+        if self.latency_ms > self.target_latency_ms or self.frame_ms > self.frame_budget_ms:
+            self.strain += 1
+            self.headroom = 0
+        elif self.latency_ms < self.target_latency_ms * 0.5 and self.frame_ms < self.frame_budget_ms * 0.8:
+            self.headroom += 1
+            self.strain = 0
+        else:
+            self.strain = self.headroom = 0
+
+        if self.strain >= self.strain_frames and self.index < len(QUALITY_LEVELS) - 1:
+            self._set_level(self.index + 1)
+        elif self.headroom >= self.headroom_frames and self.index > 0:
+            self._set_level(self.index - 1)
+
+    def _set_level(self, index):
+        self.index = index
+        self.strain = self.headroom = 0
+        self.changes += 1
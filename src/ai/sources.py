@@ -0,0 +1,244 @@
+import glob
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+Landmark = namedtuple('Landmark', ['x', 'y', 'z'])
+
+class Stream(ABC):
+    """
+    Counters and pacing shared by every input stream. read() returns (success, item), and
+    `exhausted` is set at end of stream. `realtime` streams deliver items at their recorded rate;
+    the others deliver them as fast as they are read.
+    """
+    realtime = True
+
+    def __init__(self):
+        self.exhausted = False
+        self.frames = 0
+        self.started_at = None
+
+    def open(self):
+        self.started_at = time.perf_counter()
+        return True
+
+    @abstractmethod
+    def read(self):
+        """Returns (success, item) for the next item in the stream."""
+
+    def close(self):
+        pass
+
+    def fps(self):
+        """Frames delivered per second since open()."""
+        if not self.started_at or not self.frames:
+            return 0.0
+        return self.frames / max(time.perf_counter() - self.started_at, 1e-9)
+
+    def _delivered(self, frame):
+        self.frames += 1
+        return True, frame
+
+    def _pace(self, rate):
+        # In realtime mode hold each frame back until its slot in the recorded timeline
+        if self.realtime and rate:
+            due = self.started_at + self.frames / rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+class FrameSource(Stream):
+    """
+    Where HandTracker gets its frames: read() returns (success, BGR image). The tracker drops
+    stale frames from `realtime` sources. For other sources it processes every frame.
+    """
+    @abstractmethod
+    def open(self):
+        """Opens the underlying device or files; returns False if that fails."""
+        return super().open()
+
+    @abstractmethod
+    def read(self):
+        """Returns (success, frame) for the next BGR frame."""
+
+class CameraSource(FrameSource):
+    """A live webcam via cv2.VideoCapture."""
+    def __init__(self, camera_index=0):
+        super().__init__()
+        self.camera_index = camera_index
+        self.cap = None
+
+    def open(self):
+        super().open()
+        self.cap = cv2.VideoCapture(self.camera_index)
+        if not self.cap.isOpened():
+            print(f"Error: Could not open camera {self.camera_index}.")
+            return False
+        return True
+
+    def read(self):
+        success, img = self.cap.read()
+        if not success:
+            return False, None
+        return self._delivered(img)
+
+    def close(self):
+        if self.cap:
+            self.cap.release()
+
+class VideoFileSource(FrameSource):
+    """A recorded video file, either paced at its own frame rate or read as fast as possible."""
+    def __init__(self, path, realtime=False):
+        super().__init__()
+        self.path = path
+        self.realtime = realtime
+        self.cap = None
+        self.rate = 0.0
+
+    def open(self):
+        super().open()
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            print(f"Error: Could not open video {self.path}.")
+            return False
+        self.rate = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        return True
+
+    def read(self):
+        self._pace(self.rate)
+        success, img = self.cap.read()
+        if not success:
+            self.exhausted = True
+            return False, None
+        return self._delivered(img)
+
+    def close(self):
+        if self.cap:
+            self.cap.release()
+
+class ImageDirectorySource(FrameSource):
+    """A directory of still images played back in name order as a frame sequence."""
+    def __init__(self, path, pattern='*.png', rate=30.0, realtime=False, loop=False):
+        super().__init__()
+        self.path = path
+        self.pattern = pattern
+        self.rate = rate
+        self.realtime = realtime
+        self.loop = loop
+        self.files = []
+        self.index = 0
+
+    def open(self):
+        super().open()
+        self.files = sorted(glob.glob(os.path.join(self.path, self.pattern)))
+        if not self.files:
+            print(f"Error: No images matching {self.pattern} in {self.path}.")
+            return False
+        return True
+
+    def read(self):
+        if self.index >= len(self.files):
+            if not self.loop:
+                self.exhausted = True
+                return False, None
+            self.index = 0
+        self._pace(self.rate)
+        img = cv2.imread(self.files[self.index])
+        self.index += 1
+        if img is None:
+            return False, None
+        return self._delivered(img)
+
+class LandmarkSource(Stream):
+    """
+    A recorded landmark stream, (N, 21, 3) from a .npy file or an array. It skips the camera and
+    MediaPipe entirely: each read() returns one hand as a list of Landmark(x, y, z), ready for
+    HandTracker._detect_gesture. It yields landmarks rather than frames, so it is not a
+    FrameSource and HandTracker rejects it; run it through run_landmarks instead.
+    """
+    def __init__(self, landmarks, rate=30.0, realtime=False):
+        super().__init__()
+        self.landmarks = landmarks
+        self.rate = rate
+        self.realtime = realtime
+        self.index = 0
+
+    def open(self):
+        super().open()
+        if isinstance(self.landmarks, str):
+            self.landmarks = np.load(self.landmarks)
+        return len(self.landmarks) > 0
+
+    def read(self):
+        if self.index >= len(self.landmarks):
+            self.exhausted = True
+            return False, None
+        self._pace(self.rate)
+        hand = [Landmark(*point) for point in self.landmarks[self.index].tolist()]
+        self.index += 1
+        return self._delivered(hand)
+
+def run_landmarks(source, classify):
+    """
+    Feeds every hand from a LandmarkSource through `classify` (e.g. HandTracker._detect_gesture).
+    Returns the labels and a stats dict with frames/sec and per-stage milliseconds per frame.
+    """
+    if not source.open():
+        return [], {}
+    labels = []
+    read_time = 0.0
+    classify_time = 0.0
+    while True:
+        start = time.perf_counter()
+        success, hand = source.read()
+        read_time += time.perf_counter() - start
+        if not success:
+            break
+        start = time.perf_counter()
+        labels.append(classify(hand))
+        classify_time += time.perf_counter() - start
+    source.close()
+
+    frames = max(len(labels), 1)
+    return labels, {
+        'frames': len(labels),
+        'fps': source.fps(),
+        'stage_ms': {'read': read_time * 1000 / frames, 'gesture': classify_time * 1000 / frames},
+    }
+
+if __name__ == "__main__":
+    import argparse
+    from src.ai.hand_tracker import HandTracker
+    # The tracker checks sources against src.ai.sources.FrameSource, not this __main__ copy
+    from src.ai.sources import ImageDirectorySource, LandmarkSource, VideoFileSource, run_landmarks
+
+    parser = argparse.ArgumentParser(description="Measure the gesture pipeline on recorded input.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--video', help="video file to run through the full tracker pipeline")
+    group.add_argument('--images', help="directory of images to run through the full tracker pipeline")
+    group.add_argument('--landmarks', help="(N, 21, 3) .npy landmark recording to classify directly")
+    parser.add_argument('--realtime', action='store_true', help="pace input at its recorded frame rate")
+    args = parser.parse_args()
+
+    if args.landmarks:
+        labels, stats = run_landmarks(LandmarkSource(args.landmarks, realtime=args.realtime), HandTracker._detect_gesture)
+    else:
+        if args.video:
+            source = VideoFileSource(args.video, realtime=args.realtime)
+        else:
+            source = ImageDirectorySource(args.images, realtime=args.realtime)
+        tracker = HandTracker(source=source)
+        if not tracker.start():
+            raise SystemExit(1)
+        tracker.wait_until_drained()
+        stats = tracker.get_stats()
+        stats['fps'] = source.fps()
+        tracker.stop()
+
+    print(f"Frames:     {stats.get('frames', stats.get('frames_inferred', 0))} at {stats.get('fps', 0):,.1f} fps")
+    for stage, ms in stats.get('stage_ms', {}).items():
+        print(f"  {stage:10s} {ms:8.3f} ms/frame")
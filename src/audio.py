@@ -0,0 +1,166 @@
+import os
+import time
+import wave
+from collections import namedtuple
+
+import numpy as np
+import pygame
+
+# volume: 0-1; priority: higher steals voices from lower; max_rate: plays per second, excess dropped
+SoundSpec = namedtuple('SoundSpec', ['path', 'volume', 'priority', 'max_rate'])
+
+SOUNDS = {
+    # Fires on every gravity step and soft drop, so it is cheap to drop and to cut off
+    'drop': SoundSpec('assets/drop.wav', 0.5, 0, 8),
+    'clear': SoundSpec('assets/clear.wav', 1.0, 1, 4),
+    'bomb': SoundSpec('assets/bomb.wav', 0.8, 2, 2),
+}
+MUSIC = 'assets/bgm.wav'
+MUSIC_VOLUME = 0.5
+VOICES = 6
+
+# Decoded effects, kept between runs in the mixer's sample rate and sample format
+CACHE_DIR = os.path.join('.cache', 'audio')
+
+class AudioManager:
+    """
+    Effects play on a fixed pool of mixer channels. Each sound is rate-limited, and when every
+    voice is busy a new sound only takes the oldest voice of equal or lower priority. The BGM is
+    streamed from disk by pygame.mixer.music rather than decoded into memory.
+
+    Effects that the mixer would have to resample or convert are cached in CACHE_DIR as .npz
+    files in the mixer's format, stored as one channel when all channels are identical, so later
+    runs skip the conversion. WAVs already in the mixer's rate and sample size load directly.
+    """
+    def __init__(self, specs=SOUNDS, voices=VOICES, cache_dir=CACHE_DIR):
+        self.specs = specs
+        self.cache_dir = cache_dir
+        self.sounds = {}
+        self.music_loaded = False
+        self.enabled = pygame.mixer.get_init() is not None
+
+        self.channels = []
+        if self.enabled:
+            pygame.mixer.set_num_channels(voices)
+            self.channels = [pygame.mixer.Channel(i) for i in range(voices)]
+        # Priority and start time of the sound last put on each voice
+        self.voice_priority = [0] * len(self.channels)
+        self.voice_started = [0.0] * len(self.channels)
+
+        self.min_interval = {name: 1.0 / spec.max_rate for name, spec in specs.items()}
+        self.last_played = dict.fromkeys(specs, float('-inf'))
+        self.stats = {'played': 0, 'rate_limited': 0, 'stolen': 0, 'no_voice': 0}
+
+    def load(self, timer=None):
+        """Loads every effect and starts the BGM. Safe to run on a background thread; returns True if all loaded."""
+        if not self.enabled:
+            return False
+        try:
+            started = time.perf_counter()
+            for name, spec in self.specs.items():
+                sound = self._load_sound(spec.path)
+                sound.set_volume(spec.volume)
+                self.sounds[name] = sound
+            if timer is not None:
+                timer.record('audio.effects', started)
+
+            started = time.perf_counter()
+            pygame.mixer.music.load(MUSIC)
+            pygame.mixer.music.set_volume(MUSIC_VOLUME)
+            self.music_loaded = True
+            self.play_music()
+            if timer is not None:
+                timer.record('audio.bgm', started)
+            return True
+        except Exception as e:
+            print("Audio load error:", e)
+            return False
+
+    def _cache_path(self, path):
+        freq, size, channels = pygame.mixer.get_init()
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.cache_dir, f'{stem}.{freq}.{abs(size)}.npz')
+
+    def _needs_conversion(self, path):
+        freq, size, _ = pygame.mixer.get_init()
+        try:
+            with wave.open(path) as source:
+                return source.getframerate() != freq or source.getsampwidth() * 8 != abs(size)
+        except (wave.Error, EOFError):
+            return True
+
+    def _load_sound(self, path):
+        """Returns a Sound for `path`, from the conversion cache when the mixer would have to convert it."""
+        if not self._needs_conversion(path):
+            # Plain PCM copy; cheaper than reading the cache back
+            return pygame.mixer.Sound(path)
+        channels = pygame.mixer.get_init()[2]
+        stat = os.stat(path)
+        source = np.array([stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+        cache_path = self._cache_path(path)
+        try:
+            with np.load(cache_path) as cached:
+                if np.array_equal(cached['source'], source):
+                    samples = cached['samples']
+                    if samples.ndim == 1 and channels > 1:
+                        samples = np.repeat(samples[:, np.newaxis], channels, axis=1)
+                    return pygame.sndarray.make_sound(np.ascontiguousarray(samples))
+        except (OSError, KeyError, ValueError):
+            pass
+
+        sound = pygame.mixer.Sound(path)
+        samples = pygame.sndarray.array(sound)
+        if samples.ndim == 2 and (samples == samples[:, :1]).all():
+            samples = samples[:, 0]
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temporary file first so a crash never leaves a truncated cache entry
+            temporary = cache_path + '.tmp.npz'
+            np.savez(temporary, samples=samples, source=source)
+            os.replace(temporary, cache_path)
+        except OSError as e:
+            print("Audio cache error:", e)
+        return sound
+
+    def play(self, name):
+        """Plays effect `name` if its rate limit and the voice pool allow. Returns True if it played."""
+        sound = self.sounds.get(name)
+        if sound is None:
+            return False
+        now = time.perf_counter()
+        if now - self.last_played[name] < self.min_interval[name]:
+            self.stats['rate_limited'] += 1
+            return False
+
+        priority = self.specs[name].priority
+        voice = self._free_voice(priority)
+        if voice is None:
+            self.stats['no_voice'] += 1
+            return False
+        self.channels[voice].play(sound)
+        self.voice_priority[voice] = priority
+        self.voice_started[voice] = now
+        self.last_played[name] = now
+        self.stats['played'] += 1
+        return True
+
+    def _free_voice(self, priority):
+        """Returns an idle voice, else the least important, oldest voice not above `priority`."""
+        victim = victim_key = None
+        for voice, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return voice
+            key = (self.voice_priority[voice], self.voice_started[voice])
+            if key[0] <= priority and (victim is None or key < victim_key):
+                victim, victim_key = voice, key
+        if victim is not None:
+            self.stats['stolen'] += 1
+        return victim
+
+    def play_music(self):
+        if self.music_loaded:
+            pygame.mixer.music.play(-1)
+
+    def stop_music(self):
+        if self.music_loaded:
+            pygame.mixer.music.stop()
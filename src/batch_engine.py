@@ -0,0 +1,277 @@
+import argparse
+import random
+import sys
+import time
+import numpy as np
+from src.tetris_core import GRID_WIDTH, GRID_HEIGHT, PIECE_TABLE, ROTATION_COUNTS, Randomizer, TetrisEngine
+
+# Actions accepted by BatchTetrisEngine.step, one per board
+NOOP = 0
+MOVE_LEFT = 1
+MOVE_RIGHT = 2
+ROTATE = 3
+SOFT_DROP = 4
+HARD_DROP = 5
+
+SPAWN_X = GRID_WIDTH // 2 - 2
+NUM_SHAPES = len(PIECE_TABLE)
+MAX_ROTATIONS = max(ROTATION_COUNTS)
+
+# Cell offsets for every (shape, rotation); rotations are padded by repeating the shape's own cycle
+CELL_DX = np.array([[[dx for dx, _ in PIECE_TABLE[s][r % ROTATION_COUNTS[s]].cells] for r in range(MAX_ROTATIONS)]
+                    for s in range(NUM_SHAPES)], dtype=np.int16)
+CELL_DY = np.array([[[dy for _, dy in PIECE_TABLE[s][r % ROTATION_COUNTS[s]].cells] for r in range(MAX_ROTATIONS)]
+                    for s in range(NUM_SHAPES)], dtype=np.int16)
+ROTATION_COUNT = np.array(ROTATION_COUNTS, dtype=np.int16)
+
+_ROW_INDEX = np.arange(GRID_HEIGHT, dtype=np.int16)
+
+# Randomizer's xorshift64* constants as uint64 scalars
+XS_12, XS_25, XS_27, XS_32 = (np.uint64(n) for n in (12, 25, 27, 32))
+XS_MULTIPLIER = np.uint64(0x2545F4914F6CDD1D)
+
+class BatchTetrisEngine:
+    """
+    Steps N independent games at once. Boards live in one (N, GRID_HEIGHT, GRID_WIDTH) uint8 array
+    holding 0 for empty cells and shape_type + 1 for locked blocks; every rule (collision, locking,
+    line clears, scoring, game over) follows TetrisEngine exactly, applied to all boards per call.
+
+    Every board draws its pieces from its own Randomizer, the engine's generator, so a board
+    started with seed s and mode m deals the same pieces as TetrisEngine(s, m). Board i starts with
+    seed `seed + i`, and each reset() hands out the next unused seed; `seeds` records them.
+    """
+    def __init__(self, n, seed=None, randomizer='uniform'):
+        self.n = n
+        self.mode = randomizer
+        self.next_seed = random.getrandbits(32) if seed is None else seed
+        self.randomizers = [None] * n
+        # Generator states, stepped for all boards at once in 'uniform' mode
+        self.states = np.zeros(n, dtype=np.uint64)
+        self.seeds = np.zeros(n, dtype=np.int64)
+        self.board = np.zeros((n, GRID_HEIGHT, GRID_WIDTH), dtype=np.uint8)
+        self.shape = np.zeros(n, dtype=np.int16)
+        self.next_shape = np.zeros(n, dtype=np.int16)
+        self.x = np.zeros(n, dtype=np.int16)
+        self.y = np.zeros(n, dtype=np.int16)
+        self.rotation = np.zeros(n, dtype=np.int16)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.lines = np.zeros(n, dtype=np.int64)
+        self.pieces = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.reset()
+
+    def reset(self, idx=None):
+        """Starts fresh games on the given boards (all boards by default)."""
+        if idx is None:
+            idx = np.arange(self.n)
+        idx = np.asarray(idx)
+        for i in idx:
+            self.seeds[i] = self.next_seed
+            self.randomizers[i] = Randomizer(self.next_seed, self.mode)
+            self.states[i] = self.randomizers[i].state
+            self.next_seed += 1
+        self.board[idx] = 0
+        self.shape[idx] = self._draw(idx)
+        self.next_shape[idx] = self._draw(idx)
+        self.x[idx] = SPAWN_X
+        self.y[idx] = 0
+        self.rotation[idx] = 0
+        self.score[idx] = 0
+        self.lines[idx] = 0
+        self.pieces[idx] = 0
+        self.game_over[idx] = False
+
+    def _draw(self, idx):
+        """Next shape from each board's own generator, in TetrisEngine's draw order."""
+        if self.mode == 'bag':
+            randomizers = self.randomizers
+            return np.fromiter((randomizers[i].next_shape() for i in idx), dtype=np.int16, count=len(idx))
+        # Randomizer.next_shape for 'uniform' (xorshift64* then randbelow), vectorized; uint64 wraps like MASK64
+        x = self.states[idx]
+        x ^= x >> XS_12
+        x ^= x << XS_25
+        x ^= x >> XS_27
+        self.states[idx] = x
+        return ((((x * XS_MULTIPLIER) >> XS_32) * NUM_SHAPES) >> XS_32).astype(np.int16)
+
+    def _cells(self, idx, x, y, rotation):
+        """Absolute (column, row) arrays of shape (len(idx), 4) for the given piece placements."""
+        shape = self.shape[idx]
+        return x[:, None] + CELL_DX[shape, rotation], y[:, None] + CELL_DY[shape, rotation]
+
+    def valid_space(self, idx, x, y, rotation):
+        """Vectorized TetrisEngine.valid_space for boards `idx` with the given piece placements."""
+        cx, cy = self._cells(idx, x, y, rotation)
+        inside = (cx >= 0) & (cx < GRID_WIDTH) & (cy < GRID_HEIGHT)
+        cells = self.board[idx[:, None], np.clip(cy, 0, GRID_HEIGHT - 1), np.clip(cx, 0, GRID_WIDTH - 1)]
+        # Cells above the visible grid are always accepted
+        ok = (cy < 0) | (inside & (cells == 0))
+        return ok.all(axis=1)
+
+    def drop_distance(self, idx):
+        """Rows each current piece can fall before colliding, or -1 where it already overlaps."""
+        cx, cy = self._cells(idx, self.x[idx], self.y[idx], self.rotation[idx])
+        in_walls = (cx >= 0) & (cx < GRID_WIDTH)
+
+        # Gather each cell's column and find the first filled row at or below the cell
+        column = self.board[idx[:, None, None], _ROW_INDEX[None, None, :], np.clip(cx, 0, GRID_WIDTH - 1)[:, :, None]]
+        blocked = (column != 0) & (_ROW_INDEX[None, None, :] >= cy[:, :, None])
+        stop = np.where(blocked.any(axis=2), blocked.argmax(axis=2), GRID_HEIGHT)
+        # Outside the walls a cell is only legal while it is above the grid
+        stop = np.where(in_walls, stop, 0)
+
+        distance = (stop - cy - 1).min(axis=1)
+        valid = self.valid_space(idx, self.x[idx], self.y[idx], self.rotation[idx])
+        return np.where(valid, distance, -1)
+
+    def _lock(self, idx):
+        """Locks the current pieces of boards `idx`, spawns the next ones and clears rows."""
+        cleared = np.zeros(idx.size, dtype=np.int64)
+        if idx.size == 0:
+            return cleared
+
+        cx, cy = self._cells(idx, self.x[idx], self.y[idx], self.rotation[idx])
+        visible = (cy >= 0) & (cx >= 0) & (cx < GRID_WIDTH)
+        boards = np.broadcast_to(idx[:, None], cx.shape)
+        colors = np.broadcast_to((self.shape[idx] + 1)[:, None], cx.shape)
+        self.board[boards[visible], cy[visible], cx[visible]] = colors[visible]
+        self.pieces[idx] += 1
+
+        # Spawn the next piece
+        self.shape[idx] = self.next_shape[idx]
+        self.next_shape[idx] = self._draw(idx)
+        self.x[idx] = SPAWN_X
+        self.y[idx] = 0
+        self.rotation[idx] = 0
+
+        # Line clears: stable-sort full rows to the top, then empty them
+        full = (self.board[idx] != 0).all(axis=2)
+        counts = full.sum(axis=1)
+        hit = counts > 0
+        if hit.any():
+            rows = idx[hit]
+            order = np.argsort(~full[hit], axis=1, kind='stable')
+            compacted = np.take_along_axis(self.board[rows], order[:, :, None], axis=1)
+            compacted[_ROW_INDEX[None, :] < counts[hit][:, None]] = 0
+            self.board[rows] = compacted
+            self.score[rows] += counts[hit] * 100
+            self.lines[rows] += counts[hit]
+            cleared[hit] = counts[hit]
+
+        # A player loses if any locked blocks reach the top row
+        self.game_over[idx] |= (self.board[idx, 0] != 0).any(axis=1)
+        return cleared
+
+    def step(self, actions):
+        """
+        Applies one action per board (NOOP, MOVE_LEFT, MOVE_RIGHT, ROTATE, SOFT_DROP, HARD_DROP).
+        Boards that are game over ignore their action. Returns the lines cleared on each board.
+        """
+        actions = np.asarray(actions)
+        cleared = np.zeros(self.n, dtype=np.int64)
+        alive = ~self.game_over
+
+        for action, dx in ((MOVE_LEFT, -1), (MOVE_RIGHT, 1)):
+            idx = np.flatnonzero(alive & (actions == action))
+            if idx.size:
+                x = self.x[idx] + dx
+                ok = self.valid_space(idx, x, self.y[idx], self.rotation[idx])
+                self.x[idx[ok]] = x[ok]
+
+        idx = np.flatnonzero(alive & (actions == ROTATE))
+        if idx.size:
+            rotation = (self.rotation[idx] + 1) % ROTATION_COUNT[self.shape[idx]]
+            ok = self.valid_space(idx, self.x[idx], self.y[idx], rotation)
+            self.rotation[idx[ok]] = rotation[ok]
+
+        idx = np.flatnonzero(alive & (actions == SOFT_DROP))
+        if idx.size:
+            y = self.y[idx] + 1
+            ok = self.valid_space(idx, self.x[idx], y, self.rotation[idx])
+            self.y[idx[ok]] = y[ok]
+            # If moving down failed, lock it
+            blocked = idx[~ok]
+            cleared[blocked] = self._lock(blocked)
+
+        idx = np.flatnonzero(alive & (actions == HARD_DROP))
+        if idx.size:
+            self.y[idx] += self.drop_distance(idx).astype(np.int16)
+            cleared[idx] = self._lock(idx)
+
+        return cleared
+
+def apply_action(engine, action):
+    """Applies one BatchTetrisEngine action code to a TetrisEngine."""
+    if action == MOVE_LEFT:
+        engine.move_piece(-1, 0)
+    elif action == MOVE_RIGHT:
+        engine.move_piece(1, 0)
+    elif action == ROTATE:
+        engine.rotate_piece()
+    elif action == SOFT_DROP:
+        engine.move_piece(0, 1)
+    elif action == HARD_DROP:
+        engine.hard_drop()
+
+def verify(boards, steps, seed=0, randomizer='uniform'):
+    """
+    Plays the same random actions on a BatchTetrisEngine and one TetrisEngine per board, comparing
+    every board after each step. Returns a description of the first difference, or None.
+    """
+    batch = BatchTetrisEngine(boards, seed, randomizer)
+    engines = [TetrisEngine(int(s), randomizer) for s in batch.seeds]
+    rng = np.random.default_rng(seed)
+    for step in range(steps):
+        actions = rng.integers(0, HARD_DROP + 1, boards)
+        batch.step(actions)
+        for i, engine in enumerate(engines):
+            if not engine.game_over:
+                apply_action(engine, actions[i])
+            piece = engine.current_piece
+            expected = (bytes(engine.board), piece.shape_type, engine.next_piece.shape_type, piece.x, piece.y,
+                        piece.rotation, engine.score, engine.lines, engine.pieces, engine.game_over)
+            actual = (batch.board[i].tobytes(), batch.shape[i], batch.next_shape[i], batch.x[i], batch.y[i],
+                      batch.rotation[i], batch.score[i], batch.lines[i], batch.pieces[i], batch.game_over[i])
+            if expected != actual:
+                return f"board {i} (seed {batch.seeds[i]}) differs after step {step + 1}"
+        done = np.flatnonzero(batch.game_over)
+        if done.size:
+            batch.reset(done)
+            for i in done:
+                engines[i] = TetrisEngine(int(batch.seeds[i]), randomizer)
+    return None
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure BatchTetrisEngine or check it against TetrisEngine.")
+    parser.add_argument('--boards', type=int, default=4096, help="boards stepped together")
+    parser.add_argument('--steps', type=int, default=200, help="steps per board")
+    parser.add_argument('--seed', type=int, default=0, help="seed for boards and actions")
+    parser.add_argument('--randomizer', choices=Randomizer.MODES, default='uniform', help="piece generator mode")
+    parser.add_argument('--verify', action='store_true',
+                        help="replay the actions on TetrisEngine and exit non-zero on any difference")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.verify:
+        mismatch = verify(args.boards, args.steps, args.seed, args.randomizer)
+        if mismatch:
+            print(f"MISMATCH: {mismatch}")
+            sys.exit(1)
+        print(f"OK: {args.boards} boards x {args.steps} steps match TetrisEngine")
+        return
+
+    # Throughput check with random actions
+    engine = BatchTetrisEngine(args.boards, args.seed, args.randomizer)
+    rng = np.random.default_rng(args.seed + 1)
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        engine.step(rng.integers(0, HARD_DROP + 1, args.boards))
+        if engine.game_over.any():
+            engine.reset(np.flatnonzero(engine.game_over))
+    elapsed = time.perf_counter() - start
+    print(f"{args.boards * args.steps / elapsed:,.0f} board-steps/sec "
+          f"({args.boards} boards x {args.steps} steps in {elapsed:.2f}s)")
+
+if __name__ == "__main__":
+    main()
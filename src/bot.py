@@ -0,0 +1,170 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from src.tetris_core import (GRID_WIDTH, GRID_HEIGHT, FULL_ROW, PIECE_TABLE, ROTATION_COUNTS,
+                             fits, landing_distance)
+
+# Weights for the placement heuristic; positive terms are rewarded, negative ones penalised
+HeuristicWeights = namedtuple('HeuristicWeights', ['aggregate_height', 'holes', 'bumpiness', 'lines'],
+                              defaults=(-0.510066, -0.35663, -0.184483, 0.760666))
+
+# A reachable final position for a piece, and its heuristic score
+Placement = namedtuple('Placement', ['rotation', 'x', 'y', 'score'])
+
+SPAWN_X = GRID_WIDTH // 2 - 2
+LOST_SCORE = -1e9
+
+def column_bitboards(rows):
+    """Builds the column bitboards (bit r set when row r is filled) for a row bitboard."""
+    cols = [0] * GRID_WIDTH
+    for r, bits in enumerate(rows):
+        while bits:
+            low = bits & -bits
+            cols[low.bit_length() - 1] |= 1 << r
+            bits ^= low
+    return cols
+
+@lru_cache(maxsize=1 << 16)
+def board_features(rows):
+    """Returns (aggregate height, holes, bumpiness) for a row bitboard tuple. Memoised on board state."""
+    heights = []
+    holes = 0
+    for bits in column_bitboards(rows):
+        height = GRID_HEIGHT - ((bits & -bits).bit_length() - 1) if bits else 0
+        heights.append(height)
+        holes += height - bits.bit_count()
+    bumpiness = sum(abs(heights[c] - heights[c + 1]) for c in range(GRID_WIDTH - 1))
+    return sum(heights), holes, bumpiness
+
+def place(rows, rotation, x, y):
+    """Locks a compiled rotation at (x, y) into a row bitboard tuple and clears full rows."""
+    new_rows = list(rows)
+    for dy, mask, left, _ in rotation.row_masks:
+        if y + dy >= 0:
+            new_rows[y + dy] |= mask << (x + left)
+    kept = [bits for bits in new_rows if bits != FULL_ROW]
+    lines = GRID_HEIGHT - len(kept)
+    return tuple([0] * lines + kept), lines
+
+def enumerate_placements(rows, shape_type, x, y, rotation):
+    """
+    Yields (rotation, x, landing y) for every position reachable from (x, y, rotation) by rotating
+    in place and then sliding sideways, the same inputs AutoPlayer issues before a hard drop.
+    """
+    cols = column_bitboards(rows)
+    count = ROTATION_COUNTS[shape_type]
+    for turns in range(count):
+        r = (rotation + turns) % count
+        compiled = PIECE_TABLE[shape_type][r]
+        if not fits(rows, compiled, x, y):
+            # The engine reverts a blocked rotation, so later rotations are unreachable too
+            break
+        # Cells above the grid may poke past the walls, so keep the whole piece between them
+        min_x = -compiled.bbox[0]
+        max_x = GRID_WIDTH - 1 - compiled.bbox[2]
+        for step in (-1, 1):
+            tx = x if step < 0 else x + 1
+            while min_x <= tx <= max_x and fits(rows, compiled, tx, y):
+                yield r, tx, y + landing_distance(cols, compiled, tx, y)
+                tx += step
+
+def score_board(rows, lines, weights):
+    if rows[0]:
+        return LOST_SCORE
+    height, holes, bumpiness = board_features(rows)
+    return (weights.aggregate_height * height + weights.holes * holes +
+            weights.bumpiness * bumpiness + weights.lines * lines)
+
+def best_followup(rows, lines, shape_type, weights):
+    """Best score reachable by dropping a freshly spawned `shape_type` onto `rows`."""
+    if rows[0]:
+        return LOST_SCORE
+    best = LOST_SCORE
+    for r, x, y in enumerate_placements(rows, shape_type, SPAWN_X, 0, 0):
+        new_rows, new_lines = place(rows, PIECE_TABLE[shape_type][r], x, y)
+        best = max(best, score_board(new_rows, lines + new_lines, weights))
+    return best
+
+def _score_batch(batch):
+    """Process-pool entry point: scores a batch of (rows, lines) boards against the next piece."""
+    shape_type, weights, boards = batch
+    return [best_followup(rows, lines, shape_type, weights) for rows, lines in boards]
+
+class AutoPlayer:
+    """
+    Plays TetrisEngine on its own: enumerates every reachable rotation/column for the current piece,
+    optionally looks one piece ahead using next_piece, and issues the matching engine calls.
+    """
+    def __init__(self, weights=None, lookahead=False, workers=0, batch_size=8, cache_size=1 << 14):
+        self.weights = weights or HeuristicWeights()
+        self.lookahead = lookahead
+        self.workers = workers
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        # (board, piece position, next shape) -> best Placement, so repeated states skip the search
+        self.cache = {}
+        self.pool = None
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown()
+            self.pool = None
+
+    def _followup_scores(self, boards, next_shape):
+        if not self.workers:
+            return [best_followup(rows, lines, next_shape, self.weights) for rows, lines in boards]
+
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        batches = [(next_shape, self.weights, boards[i:i + self.batch_size])
+                   for i in range(0, len(boards), self.batch_size)]
+        return [score for scores in self.pool.map(_score_batch, batches) for score in scores]
+
+    def plan(self, engine):
+        """Returns the best Placement for the engine's current piece, or None if nothing fits."""
+        piece = engine.current_piece
+        rows = tuple(engine.rows)
+        next_shape = engine.next_piece.shape_type if self.lookahead else None
+        key = (rows, piece.shape_type, piece.x, piece.y, piece.rotation, next_shape)
+        if key in self.cache:
+            return self.cache[key]
+
+        # Build the whole candidate batch first, then score it in one go
+        candidates = []
+        boards = []
+        for r, x, y in enumerate_placements(rows, piece.shape_type, piece.x, piece.y, piece.rotation):
+            candidates.append((r, x, y))
+            boards.append(place(rows, PIECE_TABLE[piece.shape_type][r], x, y))
+
+        if next_shape is None:
+            scores = [score_board(new_rows, lines, self.weights) for new_rows, lines in boards]
+        else:
+            scores = self._followup_scores(boards, next_shape)
+
+        best = None
+        for (r, x, y), score in zip(candidates, scores):
+            if best is None or score > best.score:
+                best = Placement(r, x, y, score)
+
+        if len(self.cache) >= self.cache_size:
+            self.cache.clear()
+        self.cache[key] = best
+        return best
+
+    def play(self, engine):
+        """Moves the current piece to its best placement and hard-drops it. Returns lines cleared."""
+        if engine.game_over:
+            return 0
+        placement = self.plan(engine)
+        if placement is None:
+            return engine.hard_drop()
+
+        piece = engine.current_piece
+        for _ in range((placement.rotation - piece.rotation) % ROTATION_COUNTS[piece.shape_type]):
+            engine.rotate_piece()
+        dx = placement.x - piece.x
+        step = 1 if dx > 0 else -1
+        for _ in range(abs(dx)):
+            engine.move_piece(step, 0)
+        return engine.hard_drop()
@@ -0,0 +1,148 @@
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.tetris_core import TetrisEngine, Randomizer, ROTATION_COUNTS, GRID_WIDTH
+from src.bot import AutoPlayer
+
+def random_policy(engine, rng):
+    """Spins the current piece a random number of times, slides it to a random column and drops it."""
+    piece = engine.current_piece
+    for _ in range(rng.randrange(ROTATION_COUNTS[piece.shape_type])):
+        engine.rotate_piece()
+    dx = rng.randint(-GRID_WIDTH // 2, GRID_WIDTH // 2)
+    step = 1 if dx > 0 else -1
+    for _ in range(abs(dx)):
+        engine.move_piece(step, 0)
+    return engine.hard_drop()
+
+SCRIPT_KEYS = 'LRUDH'
+
+def script_error(script):
+    """Returns why a key script can't be played, or None if it is valid."""
+    unknown = sorted(set(script.upper()) - set(SCRIPT_KEYS))
+    if unknown:
+        return f"unknown key(s) {''.join(unknown)!r}; use L/R/U/D/H"
+    if not any(key in 'DH' for key in script.upper()):
+        return "must contain at least one D or H so pieces eventually lock"
+    return None
+
+def script_policy(script):
+    """
+    Builds a policy that feeds a fixed key script, one character per input, cycling forever:
+    L/R move, U rotates, D soft-drops and H hard-drops. Each call plays inputs until a piece locks.
+    """
+    actions = {
+        'L': lambda engine: engine.move_piece(-1, 0),
+        'R': lambda engine: engine.move_piece(1, 0),
+        'U': lambda engine: engine.rotate_piece(),
+        'D': lambda engine: engine.move_piece(0, 1),
+        'H': lambda engine: engine.hard_drop(),
+    }
+    error = script_error(script)
+    if error:
+        raise ValueError(f"Invalid script {script!r}: {error}")
+    keys = [actions[key] for key in script.upper()]
+    position = [0]
+
+    def policy(engine, rng):
+        pieces = engine.pieces
+        cleared = 0
+        while engine.pieces == pieces and not engine.game_over:
+            cleared += keys[position[0] % len(keys)](engine) or 0
+            position[0] += 1
+        return cleared
+    return policy
+
+def bot_policy(lookahead, workers):
+    """Builds a policy backed by the placement-search AutoPlayer."""
+    player = AutoPlayer(lookahead=lookahead, workers=workers)
+    return lambda engine, rng: player.play(engine)
+
+POLICIES = {
+    'random': lambda args: random_policy,
+    'script': lambda args: script_policy(args.script),
+    'bot': lambda args: bot_policy(args.lookahead, args.bot_workers),
+}
+
+def play_games(games, policy_name, args, seed, max_pieces):
+    """Plays `games` complete games and returns aggregate statistics. Runs inside worker processes."""
+    policy = POLICIES[policy_name](args)
+    rng = random.Random(seed)
+    stats = {'games': 0, 'pieces': 0, 'lines': 0, 'score': 0, 'clears': [0, 0, 0, 0, 0]}
+
+    for game in range(games):
+        engine = TetrisEngine(seed * 1000003 + game, args.randomizer)
+        while not engine.game_over and engine.pieces < max_pieces:
+            cleared = policy(engine, rng)
+            if cleared:
+                stats['clears'][min(cleared, 4)] += 1
+
+        stats['games'] += 1
+        stats['pieces'] += engine.pieces
+        stats['lines'] += engine.lines
+        stats['score'] += engine.score
+    return stats
+
+def merge_stats(results):
+    total = {'games': 0, 'pieces': 0, 'lines': 0, 'score': 0, 'clears': [0, 0, 0, 0, 0]}
+    for stats in results:
+        for key in ('games', 'pieces', 'lines', 'score'):
+            total[key] += stats[key]
+        total['clears'] = [a + b for a, b in zip(total['clears'], stats['clears'])]
+    return total
+
+def run(args):
+    workers = max(1, args.workers)
+    # Split the games as evenly as possible across workers
+    shares = [args.games // workers + (1 if i < args.games % workers else 0) for i in range(workers)]
+    shares = [share for share in shares if share > 0]
+
+    start = time.perf_counter()
+    if len(shares) == 1:
+        results = [play_games(shares[0], args.policy, args, args.seed, args.max_pieces)]
+    else:
+        with ProcessPoolExecutor(max_workers=len(shares)) as pool:
+            futures = [pool.submit(play_games, share, args.policy, args, args.seed + i, args.max_pieces)
+                       for i, share in enumerate(shares)]
+            results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    return merge_stats(results), elapsed
+
+def report(stats, elapsed):
+    games = max(stats['games'], 1)
+    print(f"Games:      {stats['games']} in {elapsed:.2f}s ({stats['games'] / elapsed:,.1f} games/sec)")
+    print(f"Pieces:     {stats['pieces']} ({stats['pieces'] / elapsed:,.0f} pieces/sec, {stats['pieces'] / games:.1f} per game)")
+    print(f"Lines:      {stats['lines']} ({stats['lines'] / games:.2f} per game), average score {stats['score'] / games:.1f}")
+    singles, doubles, triples, tetrises = stats['clears'][1:]
+    print(f"Clears:     single {singles}, double {doubles}, triple {triples}, tetris {tetrises}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Play NeonLink games headless and report throughput.")
+    parser.add_argument('--games', type=int, default=100, help="number of games to play")
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='random', help="how pieces are placed")
+    parser.add_argument('--script', default='UHLLHRRH', help="key script for --policy script (L/R/U/D/H)")
+    parser.add_argument('--lookahead', action='store_true', help="let --policy bot search the next piece too")
+    parser.add_argument('--bot-workers', type=int, default=0, help="process pool size for bot lookahead scoring")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes to spread games across")
+    parser.add_argument('--max-pieces', type=int, default=1000, help="stop a game after this many pieces")
+    parser.add_argument('--randomizer', choices=Randomizer.MODES, default='uniform', help="piece generator")
+    parser.add_argument('--seed', type=int, default=0, help="base seed for piece generation and policies")
+    args = parser.parse_args(argv)
+    if args.games < 1:
+        parser.error(f"--games must be at least 1, not {args.games}")
+    if args.policy == 'script':
+        error = script_error(args.script)
+        if error:
+            parser.error(f"--script {args.script!r}: {error}")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    stats, elapsed = run(args)
+    report(stats, elapsed)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+DEFAULT_PATH = os.path.join('assets', 'leaderboard.db')
+# The single-integer high score file this store replaces; imported once into a new database
+LEGACY_HIGHSCORE = os.path.join('assets', 'highscore.txt')
+
+GameRecord = namedtuple('GameRecord', ['player', 'score', 'lines', 'pieces', 'duration_s',
+                                       'open_palm_ticks', 'closed_fist_ticks', 'thumb_up_ticks',
+                                       'avg_frame_ms', 'seed', 'finished_at'])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    lines INTEGER NOT NULL,
+    pieces INTEGER NOT NULL,
+    duration_s REAL NOT NULL,
+    open_palm_ticks INTEGER NOT NULL,
+    closed_fist_ticks INTEGER NOT NULL,
+    thumb_up_ticks INTEGER NOT NULL,
+    avg_frame_ms REAL,
+    seed INTEGER,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_score ON games (score DESC);
+CREATE INDEX IF NOT EXISTS games_by_player ON games (player, score DESC);
+"""
+INSERT = f"INSERT INTO games ({', '.join(GameRecord._fields)}) VALUES ({', '.join('?' * len(GameRecord._fields))})"
+
+def connect(path):
+    conn = sqlite3.connect(path)
+    # WAL lets the game read scores while the writer thread commits
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+class Leaderboard:
+    """
+    Per-game records in SQLite. submit() only queues a record; a writer thread inserts queued
+    records in batches, one transaction each, so the render thread never waits on the disk. A
+    batch is committed at most `flush_interval` seconds after its first record arrives.
+    Queries use their own connection on the caller's thread and are served by the score indexes.
+    """
+    def __init__(self, path=DEFAULT_PATH, batch_size=64, flush_interval=2.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = connect(path)
+        created = self.conn.execute("SELECT name FROM sqlite_master WHERE name = 'games'").fetchone() is None
+        self.conn.executescript(SCHEMA)
+        if created:
+            self._import_legacy()
+
+        self.pending = queue.Queue()
+        self.written = 0
+        self.writer = threading.Thread(target=self._write_loop, name='leaderboard', daemon=True)
+        self.writer.start()
+
+    def _import_legacy(self):
+        try:
+            with open(LEGACY_HIGHSCORE) as f:
+                score = int(f.read())
+        except (OSError, ValueError):
+            return
+        with self.conn:
+            self.conn.execute(INSERT, GameRecord('legacy', score, 0, 0, 0.0, 0, 0, 0, None, None, time.time()))
+
+    def submit(self, record):
+        """Queues a finished game for the writer thread."""
+        self.pending.put(record)
+
+    def _write_loop(self):
+        conn = connect(self.path)
+        running = True
+        while running:
+            batch = [self.pending.get()]
+            # Records arriving within flush_interval of the first go into the same transaction
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+                batch = [record for record in batch if record is not None]
+            if not batch:
+                continue
+            try:
+                with conn:
+                    conn.executemany(INSERT, batch)
+                self.written += len(batch)
+            except sqlite3.Error as e:
+                print("Leaderboard write error:", e)
+        conn.close()
+
+    def close(self):
+        """Writes everything still queued and closes the store."""
+        self.pending.put(None)
+        self.writer.join()
+        self.conn.close()
+
+    def best_score(self, player=None):
+        if player is None:
+            row = self.conn.execute("SELECT MAX(score) FROM games").fetchone()
+        else:
+            row = self.conn.execute("SELECT MAX(score) FROM games WHERE player = ?", (player,)).fetchone()
+        return row[0] or 0
+
+    def top(self, n=10, player=None):
+        """Returns the `n` best games, overall or for one player, as GameRecords."""
+        columns = ', '.join(GameRecord._fields)
+        if player is None:
+            rows = self.conn.execute(f"SELECT {columns} FROM games ORDER BY score DESC LIMIT ?", (n,))
+        else:
+            rows = self.conn.execute(f"SELECT {columns} FROM games WHERE player = ? ORDER BY score DESC LIMIT ?",
+                                     (player, n))
+        return [GameRecord(*row) for row in rows]
+
+    def player_stats(self, player):
+        """Returns totals and averages over every game `player` has finished."""
+        row = self.conn.execute(
+            "SELECT COUNT(*), MAX(score), AVG(score), SUM(lines), SUM(pieces), SUM(duration_s), AVG(avg_frame_ms) "
+            "FROM games WHERE player = ?", (player,)).fetchone()
+        keys = ('games', 'best', 'avg_score', 'lines', 'pieces', 'seconds_played', 'avg_frame_ms')
+        return dict(zip(keys, row))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show the local NeonLink leaderboard.")
+    parser.add_argument('--db', default=DEFAULT_PATH, help="leaderboard database")
+    parser.add_argument('--top', type=int, default=10, help="number of games to list")
+    parser.add_argument('--player', help="only this player's games, plus their totals")
+    args = parser.parse_args(argv)
+
+    board = Leaderboard(args.db)
+    try:
+        for rank, game in enumerate(board.top(args.top, args.player), 1):
+            when = time.strftime('%Y-%m-%d %H:%M', time.localtime(game.finished_at))
+            print(f"{rank:3d}. {game.player:12s} {game.score:8d}  {game.lines:4d} lines  "
+                  f"{game.duration_s:6.0f}s  {when}")
+        if args.player:
+            stats = board.player_stats(args.player)
+            print(f"{args.player}: {stats['games']} games, best {stats['best'] or 0}, "
+                  f"average {stats['avg_score'] or 0:.0f}, {stats['lines'] or 0} lines, "
+                  f"{(stats['seconds_played'] or 0) / 60:.0f} minutes played")
+    finally:
+        board.close()
+
+if __name__ == '__main__':
+    main()
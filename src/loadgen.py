@@ -0,0 +1,213 @@
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import deque
+
+from src.profiler import FrameProfiler
+from src.replay import MOVE_LEFT, MOVE_RIGHT, ROTATE, SOFT_DROP, HARD_DROP, GESTURE_CODES
+from src.server import (FRAME, JOIN, INPUT, STATE, DIFF, CELL, MSG_JOIN, MSG_INPUT, MSG_LEAVE,
+                        MSG_STATS, MSG_STATE, MSG_DIFF, MSG_STATS_REPLY, pack_frame)
+from src.tetris_core import SNAPSHOT_HEADER, TetrisEngine
+
+# Random player: mostly moves and rotations, with the odd drop and gesture change
+ACTIONS = [MOVE_LEFT, MOVE_RIGHT, ROTATE, ROTATE, MOVE_LEFT, MOVE_RIGHT, SOFT_DROP, HARD_DROP] + list(GESTURE_CODES.values())
+
+class ClientSession:
+    """Client-side mirror of one server game, rebuilt from snapshots and patched by diffs."""
+    def __init__(self):
+        self.board = None
+        self.seq = 0
+        # (seq, send time) of inputs the server has not acknowledged yet
+        self.pending = deque()
+
+class LoadClient:
+    """One connection carrying many sessions, each sending random inputs at `rate` per second."""
+    def __init__(self, host, port, sessions, rate, seed, profiler, totals):
+        self.host = host
+        self.port = port
+        self.count = sessions
+        self.rate = rate
+        self.rng = random.Random(seed)
+        self.profiler = profiler
+        self.totals = totals
+        self.sessions = {}
+        # Every game gets a fresh session id, so updates still in flight from a finished game
+        # (and the acks they carry) can never be mistaken for the new game's
+        self.next_id = 1
+        self.writer = None
+        self.stats_reply = None
+
+    def join(self):
+        session_id = self.next_id
+        self.next_id += 1
+        self.sessions[session_id] = ClientSession()
+        self.writer.write(pack_frame(MSG_JOIN, session_id, JOIN.pack(self.rng.getrandbits(32), self.rng.randrange(2))))
+        self.totals['games'] += 1
+
+    async def run(self, duration):
+        reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        for _ in range(self.count):
+            self.join()
+        receiving = asyncio.create_task(self.receive(reader))
+
+        interval = 0.05
+        chance = self.rate * interval
+        end = time.perf_counter() + duration
+        # Stop early if the receiver failed; awaiting it below raises its error
+        while time.perf_counter() < end and not receiving.done():
+            now = time.perf_counter()
+            out = []
+            for session_id, session in self.sessions.items():
+                if self.rng.random() >= chance:
+                    continue
+                session.seq = (session.seq + 1) & 0xFFFF
+                session.pending.append((session.seq, now))
+                out.append(pack_frame(MSG_INPUT, session_id, INPUT.pack(self.rng.choice(ACTIONS), session.seq)))
+            if out:
+                self.writer.write(b''.join(out))
+                self.totals['inputs'] += len(out)
+            await self.writer.drain()
+            await asyncio.sleep(interval)
+
+        receiving.cancel()
+        try:
+            await receiving
+        except asyncio.CancelledError:
+            pass
+        for session_id in self.sessions:
+            self.writer.write(pack_frame(MSG_LEAVE, session_id))
+        await self.writer.drain()
+        self.writer.close()
+
+    def acknowledge(self, session, ack):
+        now = time.perf_counter()
+        # Sequence numbers wrap at 16 bits; everything up to `ack` has now been applied
+        while session.pending and (ack - session.pending[0][0]) & 0xFFFF < 0x8000:
+            _, sent = session.pending.popleft()
+            self.profiler.record('input_to_state', (now - sent) * 1000)
+
+    async def receive(self, reader):
+        while True:
+            header = await reader.readexactly(FRAME.size)
+            length, msg_type, session_id = FRAME.unpack(header)
+            payload = await reader.readexactly(length) if length else b''
+            self.totals['bytes'] += FRAME.size + length
+            self.totals['updates'] += 1
+
+            if msg_type == MSG_STATS_REPLY:
+                self.stats_reply = json.loads(payload)
+                continue
+            session = self.sessions.get(session_id)
+            if session is None:
+                continue
+
+            if msg_type == MSG_STATE:
+                tick, ack = STATE.unpack_from(payload)
+                blob = payload[STATE.size:]
+                session.board = TetrisEngine.from_snapshot(blob).board
+                game_over = bool(SNAPSHOT_HEADER.unpack_from(blob)[1] & 1)
+            elif msg_type == MSG_DIFF:
+                fields = DIFF.unpack_from(payload)
+                tick, ack, flags, cells = fields[0], fields[1], fields[8], fields[9]
+                for i in range(cells):
+                    index, value = CELL.unpack_from(payload, DIFF.size + i * CELL.size)
+                    session.board[index] = value
+                game_over = bool(flags & 1)
+            else:
+                continue
+
+            self.acknowledge(session, ack)
+            if game_over:
+                # Start a fresh game in this one's place
+                del self.sessions[session_id]
+                self.writer.write(pack_frame(MSG_LEAVE, session_id))
+                self.join()
+
+async def fetch_stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(pack_frame(MSG_STATS, 0))
+    header = await reader.readexactly(FRAME.size)
+    length, _, _ = FRAME.unpack(header)
+    stats = json.loads(await reader.readexactly(length))
+    writer.close()
+    return stats
+
+async def run_load(args):
+    profiler = FrameProfiler(window=200000)
+    totals = {'games': 0, 'inputs': 0, 'updates': 0, 'bytes': 0}
+    per_client = [args.sessions // args.connections + (i < args.sessions % args.connections)
+                  for i in range(args.connections)]
+    clients = [LoadClient(args.host, args.port, count, args.rate, args.seed + i, profiler, totals)
+               for i, count in enumerate(per_client) if count]
+
+    before = await fetch_stats(args.host, args.port)
+    start = time.perf_counter()
+    await asyncio.gather(*(client.run(args.duration) for client in clients))
+    elapsed = time.perf_counter() - start
+    after = await fetch_stats(args.host, args.port)
+    return profiler.summary(), totals, before, after, elapsed
+
+def wait_for_port(host, port, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+def report(args, summary, totals, before, after, elapsed):
+    # Server CPU time over the run, as a fraction of one core
+    utilization = (after['cpu_seconds'] - before['cpu_seconds']) / max(after['uptime'] - before['uptime'], 1e-9)
+    latency = summary.get('input_to_state', {})
+    tick = after['tick_ms']
+    print(f"Sessions:   {args.sessions} over {args.connections} connections for {elapsed:.1f}s "
+          f"({totals['games']} games started)")
+    print(f"Traffic:    {totals['inputs'] / elapsed:,.0f} inputs/sec in, {totals['updates'] / elapsed:,.0f} updates/sec "
+          f"and {totals['bytes'] / elapsed / 1024:,.1f} KiB/sec out "
+          f"({totals['bytes'] / max(totals['updates'], 1):.1f} bytes/update)")
+    print(f"Server:     {utilization * 100:.1f}% of one core, "
+          f"~{args.sessions / utilization if utilization else float('inf'):,.0f} sessions per core, "
+          f"{after['overruns'] - before['overruns']} tick overruns")
+    if tick:
+        print(f"Tick time:  p50 {tick['p50']:.2f} ms, p95 {tick['p95']:.2f} ms, p99 {tick['p99']:.2f} ms "
+              f"(budget {1000 / after['tick_hz']:.1f} ms)")
+    if latency:
+        print(f"Input lag:  p50 {latency['p50']:.1f} ms, p95 {latency['p95']:.1f} ms, p99 {latency['p99']:.1f} ms "
+              f"({latency['count']:,} inputs)")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Drive a local NeonLink server with many simulated players.")
+    parser.add_argument('--host', default='127.0.0.1', help="server address")
+    parser.add_argument('--port', type=int, default=7750, help="server port")
+    parser.add_argument('--sessions', type=int, default=1000, help="concurrent games to play")
+    parser.add_argument('--connections', type=int, default=4, help="sockets to spread the sessions over")
+    parser.add_argument('--rate', type=float, default=4.0, help="inputs per session per second")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds to run")
+    parser.add_argument('--seed', type=int, default=0, help="seed for game seeds and inputs")
+    parser.add_argument('--spawn', action='store_true', help="start a server process for the run")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = None
+    if args.spawn:
+        server = subprocess.Popen([sys.executable, '-m', 'src.server', '--host', args.host, '--port', str(args.port)])
+        if not wait_for_port(args.host, args.port):
+            server.terminate()
+            raise SystemExit("Server did not start")
+    try:
+        report(args, *asyncio.run(run_load(args)))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+import csv
+import json
+import threading
+import time
+from collections import deque
+
+class FrameProfiler:
+    """
+    Rolling per-phase timings for the game loop. Call begin_frame() at the top of a frame and
+    lap(name) after each phase; each lap records the milliseconds since the previous one. Other
+    threads (the hand tracker) can add their own samples with record(). Only the last `window`
+    samples of each phase are kept, so percentiles follow current behaviour.
+    """
+    def __init__(self, window=600):
+        self.window = window
+        self.samples = {}
+        self.lock = threading.Lock()
+        self.frame_start = None
+        self.last_lap = None
+
+    def begin_frame(self):
+        self.frame_start = self.last_lap = time.perf_counter()
+
+    def lap(self, name):
+        if self.last_lap is None:
+            return
+        now = time.perf_counter()
+        self.record(name, (now - self.last_lap) * 1000)
+        self.last_lap = now
+
+    def end_frame(self):
+        """Records the whole frame's time and stops lapping until the next begin_frame()."""
+        if self.frame_start is None:
+            return
+        self.record('frame', (time.perf_counter() - self.frame_start) * 1000)
+        self.frame_start = self.last_lap = None
+
+    def record(self, name, ms):
+        with self.lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(ms)
+
+    def summary(self):
+        """Returns {phase: {'p50', 'p95', 'p99', 'mean', 'count'}} over each phase's window."""
+        with self.lock:
+            snapshot = {name: sorted(samples) for name, samples in self.samples.items() if samples}
+        result = {}
+        for name, values in snapshot.items():
+            n = len(values)
+            result[name] = {
+                'p50': values[(n - 1) * 50 // 100],
+                'p95': values[(n - 1) * 95 // 100],
+                'p99': values[(n - 1) * 99 // 100],
+                'mean': sum(values) / n,
+                'count': n,
+            }
+        return result
+
+    def export(self, path):
+        """Writes summary() to `path` as JSON, or as CSV when the name ends in .csv."""
+        summary = self.summary()
+        with open(path, 'w', newline='') as f:
+            if path.endswith('.csv'):
+                writer = csv.writer(f)
+                writer.writerow(['phase', 'p50_ms', 'p95_ms', 'p99_ms', 'mean_ms', 'count'])
+                for name, stats in summary.items():
+                    writer.writerow([name] + [round(stats[key], 3) for key in ('p50', 'p95', 'p99', 'mean')] + [stats['count']])
+            else:
+                json.dump(summary, f, indent=2)
@@ -0,0 +1,284 @@
+import argparse
+import struct
+import sys
+import time
+
+from src.tetris_core import TetrisEngine, Randomizer, RewindBuffer
+
+# Event codes. Engine inputs change the game state; gestures are logged whenever the label changes.
+MOVE_LEFT = 0
+MOVE_RIGHT = 1
+ROTATE = 2
+SOFT_DROP = 3
+HARD_DROP = 4
+GRAVITY = 5
+GESTURE_NONE = 6
+GESTURE_OPEN_PALM = 7
+GESTURE_CLOSED_FIST = 8
+GESTURE_THUMB_UP = 9
+# Rolls back the last locked piece (see RewindBuffer)
+UNDO = 10
+
+GESTURE_CODES = {
+    "NONE": GESTURE_NONE,
+    "OPEN_PALM": GESTURE_OPEN_PALM,
+    "CLOSED_FIST": GESTURE_CLOSED_FIST,
+    "THUMB_UP": GESTURE_THUMB_UP,
+}
+GESTURE_LABELS = {code: label for label, code in GESTURE_CODES.items()}
+
+# Replay ticks are the desktop game's simulation ticks
+SIM_HZ = 60
+TICK_MS = 1000 / SIM_HZ
+# Gravity interval; an open palm doubles it
+BASE_FALL_MS = 500
+
+# File layout: header, then one byte per event with the tick delta in the high nibble and the
+# event code in the low nibble. Deltas of 15 or more store 15 and continue as a LEB128 varint.
+MAGIC = b'NLRP'
+VERSION = 1
+# magic, version, randomizer mode, seed, and the first DIGEST_SIZE bytes of the live engine's
+# final state_hash() (all zero if not recorded)
+HEADER = struct.Struct('<4sBBQ16s')
+DIGEST_SIZE = 16
+NO_DIGEST = bytes(DIGEST_SIZE)
+
+def state_digest(engine):
+    """The truncated state_hash() stored in replay files."""
+    return bytes.fromhex(engine.state_hash())[:DIGEST_SIZE]
+
+def _apply(engine, code):
+    if code == MOVE_LEFT:
+        return engine.move_piece(-1, 0)
+    if code == MOVE_RIGHT:
+        return engine.move_piece(1, 0)
+    if code == ROTATE:
+        engine.rotate_piece()
+        return 0
+    if code in (SOFT_DROP, GRAVITY):
+        return engine.move_piece(0, 1)
+    if code == HARD_DROP:
+        return engine.hard_drop()
+    # Gestures only steer the game clock, which the recorded GRAVITY ticks already capture
+    return 0
+
+class TickRules:
+    """
+    The per-tick game rules shared by the desktop game, the server and the replayer: the piece
+    falls every BASE_FALL_MS (half as fast under an open palm), and a closed fist hard drops once,
+    after which the fist has to be released before it slams again.
+    """
+    def __init__(self, tick_ms=TICK_MS):
+        self.tick_ms = tick_ms
+        self.fall_ms = 0.0
+        self.fist_released = True
+
+    def step(self, engine, gesture):
+        """
+        Advances one tick under `gesture`, applying any slam and gravity step to `engine`.
+        Returns what was applied as (event code, engine result) pairs, usually none.
+        """
+        applied = ()
+        if gesture != "CLOSED_FIST":
+            self.fist_released = True
+        fall_ms = BASE_FALL_MS
+        if gesture == "OPEN_PALM":
+            fall_ms *= 2
+        elif gesture == "CLOSED_FIST" and self.fist_released:
+            applied = ((HARD_DROP, engine.hard_drop()),)
+            self.fist_released = False
+            # Restart the fall timer so the next piece does not drop straight after spawning
+            self.fall_ms = 0.0
+
+        self.fall_ms += self.tick_ms
+        if self.fall_ms >= fall_ms:
+            self.fall_ms = 0.0
+            if not engine.game_over:
+                # Moving down locks the piece when it is blocked
+                applied += ((GRAVITY, engine.move_piece(0, 1)),)
+        return applied
+
+class ReplayRecorder:
+    """Collects tick-stamped inputs for one game and encodes them in the compact replay format."""
+    def __init__(self, seed, mode='uniform'):
+        self.seed = seed
+        self.mode = mode
+        self.events = bytearray()
+        self.last_tick = 0
+        self.last_gesture = None
+        self.count = 0
+
+    @classmethod
+    def for_engine(cls, engine):
+        return cls(engine.randomizer.seed, engine.randomizer.mode)
+
+    def record(self, tick, code):
+        delta = tick - self.last_tick
+        if delta < 0:
+            raise ValueError("Replay ticks must not go backwards")
+        self.last_tick = tick
+        self.count += 1
+
+        if delta < 15:
+            self.events.append(delta << 4 | code)
+            return
+        self.events.append(0xF0 | code)
+        delta -= 15
+        while True:
+            byte = delta & 0x7F
+            delta >>= 7
+            if delta:
+                self.events.append(byte | 0x80)
+            else:
+                self.events.append(byte)
+                break
+
+    def record_gesture(self, tick, gesture):
+        """Logs a gesture label, skipping repeats of the previous one."""
+        if gesture != self.last_gesture:
+            self.last_gesture = gesture
+            self.record(tick, GESTURE_CODES.get(gesture, GESTURE_NONE))
+
+    def to_bytes(self, final_engine=None):
+        """Encodes the log; `final_engine` is the live game's engine, whose final state is stored for checking."""
+        digest = state_digest(final_engine) if final_engine is not None else NO_DIGEST
+        return HEADER.pack(MAGIC, VERSION, Randomizer.MODES.index(self.mode), self.seed, digest) + bytes(self.events)
+
+    def save(self, path, final_engine=None):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes(final_engine))
+
+class Replay:
+    """
+    A decoded replay log: the engine seed and randomizer, plus (tick, code) events. `digest` is the
+    recorded game's final state (see state_digest), or None if it was saved without one.
+    """
+    def __init__(self, seed, mode, events, digest=None):
+        self.seed = seed
+        self.mode = mode
+        self.events = events
+        self.digest = digest
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, mode, seed, digest = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a NeonLink replay file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        if digest == NO_DIGEST:
+            digest = None
+
+        events = []
+        tick = 0
+        pos = HEADER.size
+        while pos < len(data):
+            byte = data[pos]
+            pos += 1
+            delta = byte >> 4
+            if delta == 15:
+                shift = 0
+                while True:
+                    extra = data[pos]
+                    pos += 1
+                    delta += (extra & 0x7F) << shift
+                    shift += 7
+                    if not extra & 0x80:
+                        break
+            tick += delta
+            events.append((tick, byte & 0x0F))
+        return cls(seed, Randomizer.MODES[mode], events, digest)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+    def simulate(self, rules=False):
+        """
+        Re-plays every event on a fresh engine as fast as possible and returns the engine. With
+        `rules`, the logged GRAVITY and HARD_DROP events are ignored and TickRules regenerates
+        them from the logged gestures instead. This fits desktop game logs, where every hard
+        drop is a fist slam.
+        """
+        if rules:
+            return self._simulate_rules()
+        engine = TetrisEngine(self.seed, self.mode)
+        # Mirrors the game's rewind buffer so UNDO events land on the same states
+        rewind = RewindBuffer()
+        rewind.checkpoint(engine)
+        for _, code in self.events:
+            if code == UNDO:
+                rewind.undo(engine)
+            else:
+                _apply(engine, code)
+                rewind.checkpoint(engine)
+        return engine
+
+    def _simulate_rules(self):
+        engine = TetrisEngine(self.seed, self.mode)
+        rewind = RewindBuffer()
+        rewind.checkpoint(engine)
+        rules = TickRules()
+        gesture = "NONE"
+        tick = 0
+        for event_tick, code in self.events:
+            # Run the ticks up to this event. A gesture change is logged at the start of its tick;
+            # key inputs logged at a tick were handled after it.
+            while tick < event_tick:
+                tick += 1
+                if tick == event_tick and code in GESTURE_LABELS:
+                    gesture = GESTURE_LABELS[code]
+                if not engine.game_over:
+                    for _ in rules.step(engine, gesture):
+                        rewind.checkpoint(engine)
+            if code in GESTURE_LABELS:
+                gesture = GESTURE_LABELS[code]
+            elif code == UNDO:
+                rewind.undo(engine)
+            elif code not in (GRAVITY, HARD_DROP):
+                _apply(engine, code)
+                rewind.checkpoint(engine)
+        return engine
+
+    def matches(self, engine):
+        """True if `engine` (a simulate() result) ended where the recorded game did; None if nothing was recorded."""
+        if self.digest is None:
+            return None
+        return state_digest(engine) == self.digest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-simulate NeonLink replay logs headless at full speed.")
+    parser.add_argument('paths', nargs='+', help="replay files to play back")
+    parser.add_argument('--repeat', type=int, default=1, help="play each replay this many times for timing")
+    parser.add_argument('--rules', action='store_true',
+                        help="regenerate gravity and fist slams from the logged gestures instead of replaying them")
+    args = parser.parse_args(argv)
+
+    mismatches = 0
+    for path in args.paths:
+        replay = Replay.load(path)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            engine = replay.simulate(args.rules)
+        elapsed = time.perf_counter() - start
+
+        ticks = replay.events[-1][0] if replay.events else 0
+        rate = len(replay.events) * args.repeat / elapsed if elapsed > 0 else 0.0
+        print(f"{path}: {len(replay.events)} events over {ticks} ticks, {engine.pieces} pieces, "
+              f"score {engine.score}, {rate:,.0f} events/sec")
+        matches = replay.matches(engine)
+        if matches is None:
+            verdict = "not recorded in this file"
+        elif matches:
+            verdict = "matches the recorded game"
+        else:
+            verdict = f"DIVERGED from the recorded game ({replay.digest.hex()}...)"
+            mismatches += 1
+        print(f"  state {engine.state_hash()} {verdict}")
+    if mismatches:
+        print(f"{mismatches} of {len(args.paths)} replays diverged")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
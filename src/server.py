@@ -0,0 +1,246 @@
+import argparse
+import asyncio
+import json
+import struct
+import time
+
+from src.profiler import FrameProfiler
+from src.replay import (MOVE_LEFT, MOVE_RIGHT, ROTATE, SOFT_DROP, HARD_DROP, UNDO, GESTURE_LABELS, SIM_HZ,
+                        TickRules)
+from src.tetris_core import TetrisEngine, RewindBuffer, GRID_WIDTH, GRID_HEIGHT
+
+# Wire format: every frame is FRAME (payload length, message type, session id) plus the payload.
+# Session ids are chosen by the client and are scoped to its connection, so one socket can carry
+# thousands of games.
+FRAME = struct.Struct('<HBI')
+
+# Client -> server
+MSG_JOIN = 1     # payload JOIN: start a game
+MSG_INPUT = 2    # payload INPUT: one replay event code and a sequence number to acknowledge
+MSG_LEAVE = 3    # no payload
+MSG_STATS = 4    # no payload; answered with MSG_STATS_REPLY
+JOIN = struct.Struct('<QB')    # seed, randomizer mode index
+INPUT = struct.Struct('<BH')   # event code, input sequence number
+
+# Server -> client
+MSG_STATE = 10        # payload STATE + TetrisEngine.snapshot() blob
+MSG_DIFF = 11         # payload DIFF + (cell index, palette index) per changed board cell
+MSG_STATS_REPLY = 12  # payload is JSON
+STATE = struct.Struct('<IH')             # tick, last applied input sequence
+DIFF = struct.Struct('<IHBbbBIIBB')     # tick, ack, piece, x, y, next piece, score, lines, flags, cells
+CELL = struct.Struct('<BB')
+
+# A board diff that touches more cells than this is sent as a full snapshot instead
+MAX_DIFF_CELLS = 60
+# Connections whose unsent output grows past this skip diffs and get a snapshot once they drain
+MAX_WRITE_BUFFER = 1 << 20
+
+def pack_frame(msg_type, session_id, payload=b''):
+    return FRAME.pack(len(payload), msg_type, session_id) + payload
+
+class Session:
+    """
+    One authoritative game: queued inputs are applied and gravity advanced once per server tick.
+    Inputs use the replay event codes, and gestures steer the same TickRules as the desktop game.
+    """
+    def __init__(self, seed, mode, tick_ms):
+        self.engine = TetrisEngine(seed, mode)
+        self.rewind = RewindBuffer()
+        self.rewind.checkpoint(self.engine)
+        self.inputs = []
+        self.ack = 0
+        self.gesture = "NONE"
+        self.rules = TickRules(tick_ms)
+        # What the client last saw, so only changes are sent
+        self.sent_board = bytearray(self.engine.board)
+        self.sent_key = None
+        self.needs_state = True
+
+    def apply(self, code):
+        engine = self.engine
+        if code == MOVE_LEFT:
+            engine.move_piece(-1, 0)
+        elif code == MOVE_RIGHT:
+            engine.move_piece(1, 0)
+        elif code == ROTATE:
+            engine.rotate_piece()
+        elif code == SOFT_DROP:
+            engine.move_piece(0, 1)
+        elif code == HARD_DROP:
+            engine.hard_drop()
+        elif code == UNDO:
+            if self.rewind.undo(engine):
+                self.needs_state = True
+            return
+        elif code in GESTURE_LABELS:
+            self.gesture = GESTURE_LABELS[code]
+            return
+        self.rewind.checkpoint(engine)
+
+    def tick(self):
+        """Advances the game by one tick. Returns True if anything the client sees may have changed."""
+        engine = self.engine
+        changed = bool(self.inputs)
+        if changed:
+            for code, seq in self.inputs:
+                self.apply(code)
+                self.ack = seq
+            self.inputs.clear()
+        if engine.game_over:
+            return changed
+
+        for _ in self.rules.step(engine, self.gesture):
+            self.rewind.checkpoint(engine)
+            changed = True
+        return changed
+
+    def encode_update(self, tick, session_id):
+        """Returns the frame that brings the client up to date, or b'' if nothing changed."""
+        engine = self.engine
+        piece, upcoming = engine.current_piece, engine.next_piece
+        key = (piece.shape_type, piece.rotation, piece.x, piece.y, engine.board_version, self.ack)
+        if key == self.sent_key and not self.needs_state:
+            return b''
+        self.sent_key = key
+
+        cells = []
+        board = engine.board
+        if not self.needs_state and board != self.sent_board:
+            sent = self.sent_board
+            cells = [i for i in range(GRID_WIDTH * GRID_HEIGHT) if board[i] != sent[i]]
+            if len(cells) > MAX_DIFF_CELLS:
+                self.needs_state = True
+        self.sent_board[:] = board
+
+        if self.needs_state:
+            self.needs_state = False
+            return pack_frame(MSG_STATE, session_id, STATE.pack(tick, self.ack) + engine.snapshot())
+
+        payload = DIFF.pack(tick, self.ack, piece.shape_type << 2 | piece.rotation, piece.x, piece.y,
+                            upcoming.shape_type << 2 | upcoming.rotation, engine.score, engine.lines,
+                            int(engine.game_over), len(cells))
+        payload += b''.join(CELL.pack(i, board[i]) for i in cells)
+        return pack_frame(MSG_DIFF, session_id, payload)
+
+class GameServer:
+    """
+    Hosts many concurrent games. Each connection's reader only queues inputs; a single scheduler
+    task advances every session on a shared fixed tick and sends each connection one write per
+    tick with the updates for all of its sessions.
+    """
+    def __init__(self, tick_hz=SIM_HZ):
+        self.tick_hz = tick_hz
+        self.tick_ms = 1000 / tick_hz
+        self.tick = 0
+        # writer -> {session id: Session}
+        self.connections = {}
+        self.profiler = FrameProfiler(window=3600)
+        self.overruns = 0
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+
+    def session_count(self):
+        return sum(len(sessions) for sessions in self.connections.values())
+
+    def stats(self):
+        summary = self.profiler.summary()
+        wall = time.perf_counter() - self.started
+        cpu = time.process_time() - self.cpu_started
+        return {
+            'sessions': self.session_count(),
+            'connections': len(self.connections),
+            'tick': self.tick,
+            'tick_hz': self.tick_hz,
+            'overruns': self.overruns,
+            'tick_ms': summary.get('tick', {}),
+            'uptime': wall,
+            'cpu_seconds': cpu,
+        }
+
+    async def handle_connection(self, reader, writer):
+        sessions = self.connections[writer] = {}
+        try:
+            while True:
+                header = await reader.readexactly(FRAME.size)
+                length, msg_type, session_id = FRAME.unpack(header)
+                payload = await reader.readexactly(length) if length else b''
+
+                if msg_type == MSG_INPUT:
+                    session = sessions.get(session_id)
+                    if session is not None:
+                        session.inputs.append(INPUT.unpack(payload))
+                elif msg_type == MSG_JOIN:
+                    seed, mode = JOIN.unpack(payload)
+                    sessions[session_id] = Session(seed, 'bag' if mode else 'uniform', self.tick_ms)
+                elif msg_type == MSG_LEAVE:
+                    sessions.pop(session_id, None)
+                elif msg_type == MSG_STATS:
+                    writer.write(pack_frame(MSG_STATS_REPLY, session_id, json.dumps(self.stats()).encode()))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            print("Server connection error:", e)
+        finally:
+            self.connections.pop(writer, None)
+            writer.close()
+
+    def step(self):
+        """Advances every session by one tick and flushes the updates."""
+        self.tick += 1
+        tick = self.tick
+        for writer, sessions in list(self.connections.items()):
+            out = []
+            congested = writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER
+            for session_id, session in sessions.items():
+                if not session.tick() and not session.needs_state:
+                    continue
+                if congested:
+                    # The client fell behind: stop diffing and resynchronize with a snapshot later
+                    session.needs_state = True
+                    continue
+                update = session.encode_update(tick, session_id)
+                if update:
+                    out.append(update)
+            if out and not writer.is_closing():
+                writer.write(b''.join(out))
+
+    async def run_ticks(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        interval = 1 / self.tick_hz
+        while True:
+            start = time.perf_counter()
+            self.step()
+            self.profiler.record('tick', (time.perf_counter() - start) * 1000)
+
+            next_tick += interval
+            delay = next_tick - loop.time()
+            if delay < 0:
+                # Running behind: note it and re-anchor rather than bursting to catch up
+                self.overruns += 1
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"NeonLink server on {host}:{port} ticking at {self.tick_hz} Hz")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.run_ticks())
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Host many NeonLink games over a local socket protocol.")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on")
+    parser.add_argument('--port', type=int, default=7750, help="TCP port to listen on")
+    parser.add_argument('--tick-hz', type=int, default=SIM_HZ, help="simulation ticks per second")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        asyncio.run(GameServer(args.tick_hz).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+import threading
+import time
+from contextlib import contextmanager
+
+class StartupTimer:
+    """
+    Wall-clock breakdown of startup. Phases may run on any thread; each is kept with the thread
+    it ran on and its start offset from `origin`, so overlapping background work shows up as such.
+    """
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        # (name, thread name, start offset ms, duration ms)
+        self.phases = []
+        self.lock = threading.Lock()
+
+    def record(self, name, started, ended=None):
+        ended = time.perf_counter() if ended is None else ended
+        with self.lock:
+            self.phases.append((name, threading.current_thread().name,
+                                (started - self.origin) * 1000, (ended - started) * 1000))
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, started)
+
+    def mark(self, name):
+        """Records an instant, e.g. the first frame reaching the screen."""
+        self.record(name, time.perf_counter())
+
+    def report(self):
+        """Returns the phases in start order as a printable table."""
+        with self.lock:
+            phases = sorted(self.phases, key=lambda phase: phase[2])
+        total = max((start + ms for _, _, start, ms in phases), default=0.0)
+        lines = [f"Startup timing ({total:.0f} ms until everything was ready):",
+                 f"  {'phase':16s} {'thread':10s} {'start ms':>9s} {'took ms':>8s}"]
+        for name, thread, start, ms in phases:
+            lines.append(f"  {name:16s} {thread:10s} {start:9.0f} {ms:8.0f}")
+        return '\n'.join(lines)
+
+class BackgroundTask:
+    """Runs `target()` on a daemon thread, timed as phase `name`. The game polls ready() each frame."""
+    def __init__(self, name, target, timer):
+        self.name = name
+        self.target = target
+        self.timer = timer
+        self.result = None
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        try:
+            with self.timer.phase(self.name):
+                self.result = self.target()
+        except Exception as e:
+            print(f"{self.name.capitalize()} load error:", e)
+        finally:
+            self.done.set()
+
+    def ready(self):
+        return self.done.is_set()
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
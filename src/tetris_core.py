@@ -1,5 +1,7 @@
-import pygame
+import hashlib
 import random
+import struct
+from collections import deque, namedtuple
 
 # Standard Tetris grid dimensions
 GRID_WIDTH = 10
@@ -140,73 +142,351 @@ COLORS = [
     (255, 165, 0)   # Orange - L
 ]
 
+# Board cell values: 0 is empty, k + 1 is a block of shape k drawn in COLORS[k]
+PALETTE = [(0, 0, 0)] + COLORS
+
+# Bitmask of a completely filled row (bit j = column j)
+FULL_ROW = (1 << GRID_WIDTH) - 1
+
+# One shape rotation compiled into offsets relative to the piece's (x, y):
+#   cells     - (dx, dy) of every block, in the same order the ASCII art is read
+#   bbox      - (min_dx, min_dy, max_dx, max_dy)
+#   bottom    - (dx, lowest dy) for every occupied column, left to right
+#   row_masks - (dy, mask, left, right) per occupied row; bit 0 of mask is column `left`
+PieceRotation = namedtuple('PieceRotation', ['cells', 'bbox', 'bottom', 'row_masks'])
+
+def compile_rotation(image):
+    """Parses one 5x6 ASCII shape into a PieceRotation, applying the (-2, -4) centering offset."""
+    cells = tuple((j - 2, i - 4) for i, line in enumerate(image) for j, column in enumerate(line) if column == '#')
+    xs = [dx for dx, _ in cells]
+    ys = [dy for _, dy in cells]
+    bbox = (min(xs), min(ys), max(xs), max(ys))
+
+    lowest = {}
+    for dx, dy in cells:
+        lowest[dx] = max(lowest.get(dx, dy), dy)
+    bottom = tuple(sorted(lowest.items()))
+
+    row_masks = []
+    for dy in sorted(set(ys)):
+        cols = [dx for dx, cy in cells if cy == dy]
+        left = min(cols)
+        mask = 0
+        for c in cols:
+            mask |= 1 << (c - left)
+        row_masks.append((dy, mask, left, max(cols)))
+
+    return PieceRotation(cells, bbox, bottom, tuple(row_masks))
+
+# Compiled once at import time: PIECE_TABLE[shape_type][rotation] -> PieceRotation
+PIECE_TABLE = tuple(tuple(compile_rotation(image) for image in shape) for shape in SHAPES)
+ROTATION_COUNTS = tuple(len(shape) for shape in PIECE_TABLE)
+
+def fits(rows, rotation, x, y):
+    """Checks a compiled PieceRotation placed at (x, y) against a row bitboard."""
+    for dy, mask, left, right in rotation.row_masks:
+        r = y + dy
+        # Cells above the visible grid are always accepted
+        if r < 0:
+            continue
+        if r >= GRID_HEIGHT or x + left < 0 or x + right >= GRID_WIDTH:
+            return False
+        if rows[r] & (mask << (x + left)):
+            return False
+    return True
+
+def landing_distance(cols, rotation, x, y):
+    """
+    Returns how many rows a non-overlapping piece at (x, y) can fall, using column bitboards.
+    Only the lowest cell of each occupied column can be the first to collide.
+    """
+    distance = None
+    for dx, dy in rotation.bottom:
+        cx = x + dx
+        cy = y + dy
+        if 0 <= cx < GRID_WIDTH:
+            # First filled row at or below the cell, or the floor
+            start = max(cy, 0)
+            below = cols[cx] >> start
+            stop = start + (below & -below).bit_length() - 1 if below else GRID_HEIGHT
+        else:
+            # Outside the walls the cell is only legal while it is above the grid
+            stop = 0
+        if distance is None or stop - cy - 1 < distance:
+            distance = stop - cy - 1
+    return distance
+
+# Read-only view of the incrementally maintained board statistics
+BoardMetrics = namedtuple('BoardMetrics', ['heights', 'row_fill', 'column_holes', 'aggregate_height',
+                                           'max_height', 'holes', 'bumpiness'])
+
+MASK64 = (1 << 64) - 1
+
+def _splitmix64(value):
+    """Scrambles a seed into a well-mixed 64-bit generator state."""
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+class Randomizer:
+    """
+    Deterministic piece generator owned by the engine. 'uniform' draws every shape independently,
+    'bag' deals shuffled bags holding each of the seven shapes once. Uses xorshift64*, so the
+    whole generator state is one 64-bit integer plus the rest of the current bag.
+    """
+    MODES = ('uniform', 'bag')
+
+    def __init__(self, seed=None, mode='uniform'):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown randomizer mode: {mode}")
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed & MASK64
+        self.mode = mode
+        self.state = _splitmix64(self.seed) or 1
+        self.bag = []
+
+    def _next(self):
+        x = self.state
+        x ^= x >> 12
+        x ^= (x << 25) & MASK64
+        x ^= x >> 27
+        self.state = x
+        return (x * 0x2545F4914F6CDD1D) & MASK64
+
+    def randbelow(self, n):
+        return ((self._next() >> 32) * n) >> 32
+
+    def next_shape(self):
+        if self.mode == 'bag':
+            if not self.bag:
+                bag = list(range(len(SHAPES)))
+                # Fisher-Yates shuffle
+                for i in range(len(bag) - 1, 0, -1):
+                    j = self.randbelow(i + 1)
+                    bag[i], bag[j] = bag[j], bag[i]
+                self.bag = bag
+            return self.bag.pop()
+        return self.randbelow(len(SHAPES))
+
+# Snapshot layout: this header, the remaining bag (one byte per shape), the row bitboards packed
+# into 25 bytes, then the PALETTE index of every filled cell in row-major order, two per byte.
+# Pieces are stored as (shape << 2 | rotation, x, y); flags bit 0 is game_over, bit 1 bag mode.
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<BBBbbBbbIIIQQB')
+BOARD_BYTES = (GRID_WIDTH * GRID_HEIGHT + 7) // 8
+
 class Piece:
-    def __init__(self, x, y):
+    def __init__(self, x, y, shape_type=None):
         self.x = x
         self.y = y
-        self.shape_type = random.randint(0, len(SHAPES) - 1)
+        self.shape_type = random.randint(0, len(SHAPES) - 1) if shape_type is None else shape_type
         self.rotation = 0
         self.color = COLORS[self.shape_type]
 
     def image(self):
         return SHAPES[self.shape_type][self.rotation]
 
+    def compiled(self):
+        """Returns the precomputed PieceRotation for the current shape and rotation."""
+        return PIECE_TABLE[self.shape_type][self.rotation]
+
 class TetrisEngine:
-    def __init__(self):
-        self.grid = self.create_grid()
+    def __init__(self, seed=None, randomizer='uniform'):
+        # Owns the piece sequence so a game can be reproduced from its seed
+        self.randomizer = Randomizer(seed, randomizer)
+        # Locked cells as PALETTE indices, one byte per cell in row-major order
+        self.board = self.create_grid()
+        # Occupancy bitboard: one integer per row, bit j set when column j is filled
+        self.rows = [0] * GRID_HEIGHT
+        # Column bitboards (bit r set when row r is filled) and the metrics derived from them.
+        # These are updated as pieces lock so nothing needs to rescan the grid.
+        self.cols = [0] * GRID_WIDTH
+        self.row_fill = [0] * GRID_HEIGHT
+        self.heights = [0] * GRID_WIDTH
+        self.column_holes = [0] * GRID_WIDTH
+        self.aggregate_height = 0
+        self.holes = 0
+        self.bumpiness = 0
         self.current_piece = self.get_new_piece()
         self.next_piece = self.get_new_piece()
         self.score = 0
+        self.lines = 0
+        self.pieces = 0
+        # Bumped whenever locked cells change, so renderers can cache the board
+        self.board_version = 0
         self.game_over = False
 
     def create_grid(self):
-        return [[(0, 0, 0) for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+        return bytearray(GRID_WIDTH * GRID_HEIGHT)
+
+    @property
+    def grid(self):
+        """The board as rows of (r, g, b) tuples, built on demand."""
+        board = self.board
+        return [[PALETTE[board[y * GRID_WIDTH + x]] for x in range(GRID_WIDTH)] for y in range(GRID_HEIGHT)]
+
+    def board_array(self):
+        """Returns a (GRID_HEIGHT, GRID_WIDTH) uint8 NumPy view of the board (no copy)."""
+        import numpy as np
+        return np.frombuffer(self.board, dtype=np.uint8).reshape(GRID_HEIGHT, GRID_WIDTH)
 
     def get_new_piece(self):
-        return Piece(GRID_WIDTH // 2 - 2, 0)
+        return Piece(GRID_WIDTH // 2 - 2, 0, self.randomizer.next_shape())
+
+    def state_hash(self):
+        """Returns a hex digest of the board, pieces, score and generator, for checking replays."""
+        pieces = [(p.shape_type, p.x, p.y, p.rotation) for p in (self.current_piece, self.next_piece)]
+        state = (bytes(self.board), pieces, self.score, self.lines, self.pieces, self.game_over,
+                 self.randomizer.state, self.randomizer.bag)
+        return hashlib.sha256(repr(state).encode()).hexdigest()
+
+    def snapshot(self):
+        """Serializes the complete game state into a compact bytes blob (see SNAPSHOT_HEADER)."""
+        current, upcoming = self.current_piece, self.next_piece
+        rng = self.randomizer
+        flags = int(self.game_over) | (rng.mode == 'bag') << 1
+        header = SNAPSHOT_HEADER.pack(
+            SNAPSHOT_VERSION, flags,
+            current.shape_type << 2 | current.rotation, current.x, current.y,
+            upcoming.shape_type << 2 | upcoming.rotation, upcoming.x, upcoming.y,
+            self.score, self.lines, self.pieces, rng.state, rng.seed, len(rng.bag))
+
+        occupancy = 0
+        for r, bits in enumerate(self.rows):
+            occupancy |= bits << (r * GRID_WIDTH)
+        colors = self.board.translate(None, b'\x00')
+        if len(colors) & 1:
+            colors.append(0)
+        packed = bytes(low | high << 4 for low, high in zip(colors[::2], colors[1::2]))
+        return header + bytes(rng.bag) + occupancy.to_bytes(BOARD_BYTES, 'little') + packed
+
+    def restore(self, blob):
+        """Replaces the whole game state with one produced by snapshot()."""
+        (version, flags, current, cx, cy, upcoming, nx, ny, score, lines, pieces,
+         state, seed, bag_len) = SNAPSHOT_HEADER.unpack_from(blob)
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        pos = SNAPSHOT_HEADER.size
+
+        rng = Randomizer.__new__(Randomizer)
+        rng.seed = seed
+        rng.mode = 'bag' if flags & 2 else 'uniform'
+        rng.state = state
+        rng.bag = list(blob[pos:pos + bag_len])
+        pos += bag_len
+        self.randomizer = rng
+
+        occupancy = int.from_bytes(blob[pos:pos + BOARD_BYTES], 'little')
+        pos += BOARD_BYTES
+        colors = []
+        for byte in blob[pos:]:
+            colors.append(byte & 0x0F)
+            colors.append(byte >> 4)
+
+        board = bytearray(GRID_WIDTH * GRID_HEIGHT)
+        rows = [0] * GRID_HEIGHT
+        cols = [0] * GRID_WIDTH
+        n = 0
+        for r in range(GRID_HEIGHT):
+            bits = (occupancy >> (r * GRID_WIDTH)) & FULL_ROW
+            rows[r] = bits
+            while bits:
+                low = bits & -bits
+                c = low.bit_length() - 1
+                board[r * GRID_WIDTH + c] = colors[n]
+                cols[c] |= 1 << r
+                n += 1
+                bits ^= low
+
+        if hasattr(self, 'board'):
+            # Keep the existing buffer so NumPy views from board_array() stay valid
+            self.board[:] = board
+        else:
+            self.board = board
+        self.rows = rows
+        self.cols = cols
+        self.row_fill = [bits.bit_count() for bits in rows]
+        self.heights = [0] * GRID_WIDTH
+        self.column_holes = [0] * GRID_WIDTH
+        self.aggregate_height = self.holes = self.bumpiness = 0
+        self._refresh_columns(range(GRID_WIDTH))
+
+        self.current_piece = Piece(cx, cy, current >> 2)
+        self.current_piece.rotation = current & 3
+        self.next_piece = Piece(nx, ny, upcoming >> 2)
+        self.next_piece.rotation = upcoming & 3
+        self.score = score
+        self.lines = lines
+        self.pieces = pieces
+        self.game_over = bool(flags & 1)
+        # Renderers cache on board_version, so restoring always counts as a change
+        self.board_version = getattr(self, 'board_version', 0) + 1
+
+    @classmethod
+    def from_snapshot(cls, blob):
+        """Builds a new engine directly from a snapshot, without generating a fresh game first."""
+        engine = cls.__new__(cls)
+        engine.restore(blob)
+        return engine
 
     def convert_shape_format(self, piece):
-        positions = []
-        format = piece.image()
-        
-        for i, line in enumerate(format):
-            row = list(line)
-            for j, column in enumerate(row):
-                if column == '#':
-                    positions.append((piece.x + j, piece.y + i))
-                    
-        # Offset to center the shape
-        for i, pos in enumerate(positions):
-            positions[i] = (pos[0] - 2, pos[1] - 4)
-            
-        return positions
+        x, y = piece.x, piece.y
+        return [(x + dx, y + dy) for dx, dy in PIECE_TABLE[piece.shape_type][piece.rotation].cells]
 
     def valid_space(self, piece):
-        accepted_pos = [[(j, i) for j in range(GRID_WIDTH) if self.grid[i][j] == (0, 0, 0)] for i in range(GRID_HEIGHT)]
-        accepted_pos = [j for sub in accepted_pos for j in sub]
-        
-        formatted = self.convert_shape_format(piece)
-        
-        for pos in formatted:
-            if pos not in accepted_pos:
-                if pos[1] > -1:
-                    return False
-        return True
+        return fits(self.rows, PIECE_TABLE[piece.shape_type][piece.rotation], piece.x, piece.y)
+
+    def drop_distance(self, piece):
+        """Returns how many rows the piece can fall before it collides, or -1 if it already overlaps."""
+        rotation = PIECE_TABLE[piece.shape_type][piece.rotation]
+        if not fits(self.rows, rotation, piece.x, piece.y):
+            return -1
+        return landing_distance(self.cols, rotation, piece.x, piece.y)
+
+    def metrics(self):
+        """Returns a snapshot of the board statistics maintained by lock_piece and clear_rows."""
+        return BoardMetrics(tuple(self.heights), tuple(self.row_fill), tuple(self.column_holes),
+                            self.aggregate_height, max(self.heights), self.holes, self.bumpiness)
+
+    def _refresh_columns(self, columns):
+        """Recomputes height and holes for the given columns and patches the running totals."""
+        heights = self.heights
+        pairs = {p for c in columns for p in (c - 1, c) if 0 <= p < GRID_WIDTH - 1}
+        self.bumpiness -= sum(abs(heights[p] - heights[p + 1]) for p in pairs)
+
+        for c in columns:
+            bits = self.cols[c]
+            # The lowest set bit is the topmost filled row
+            height = GRID_HEIGHT - ((bits & -bits).bit_length() - 1) if bits else 0
+            holes = height - bits.bit_count()
+            self.aggregate_height += height - heights[c]
+            self.holes += holes - self.column_holes[c]
+            heights[c] = height
+            self.column_holes[c] = holes
+
+        self.bumpiness += sum(abs(heights[p] - heights[p + 1]) for p in pairs)
 
     def check_lost(self):
         # A player loses if any locked blocks reach the very top of the grid (y=0)
         # We check the top row of the grid to ensure we only end the game when the stack fills up
-        for pos in self.grid[0]:
-            if pos != (0, 0, 0):
-                return True
-        return False
+        return self.rows[0] != 0
 
     def lock_piece(self):
         form = self.convert_shape_format(self.current_piece)
+        touched = set()
         for pos in form:
             x, y = pos
             if y > -1:
-                self.grid[y][x] = self.current_piece.color
+                self.board[y * GRID_WIDTH + x] = self.current_piece.shape_type + 1
+                self.rows[y] |= 1 << x
+                self.cols[x] |= 1 << y
+                self.row_fill[y] = self.rows[y].bit_count()
+                touched.add(x)
+        self._refresh_columns(touched)
+        self.pieces += 1
+        self.board_version += 1
                 
         self.current_piece = self.next_piece
         self.next_piece = self.get_new_piece()
@@ -218,31 +498,30 @@ class TetrisEngine:
         return cleared_lines
 
     def clear_rows(self):
-        inc = 0
-        # Iterate backwards from bottom to top
-        for i in range(len(self.grid) - 1, -1, -1):
-            row = self.grid[i]
-            # If there are no empty blocks in this row, it's full
-            if (0, 0, 0) not in row:
-                inc += 1
-                ind = i
-                
-                # Clear the row
-                for j in range(len(row)):
-                    self.grid[i][j] = (0, 0, 0)
+        # A row is full when its bitmask has every column set
+        cleared = [i for i in range(GRID_HEIGHT) if self.rows[i] == FULL_ROW]
+        inc = len(cleared)
                     
         if inc > 0:
-            # We found full rows. Now shift everything above `ind` downwards by `inc` rows
-            # We iterate backwards starting just above the highest cleared line
-            for i in range(ind - 1, -1, -1):
-                for j in range(len(self.grid[i])):
-                    if self.grid[i][j] != (0, 0, 0):
-                        # Move the block down
-                        self.grid[i + inc][j] = self.grid[i][j]
-                        # Empty the old spot
-                        self.grid[i][j] = (0, 0, 0)
+            # Drop the full rows and shift everything above them down by the number of rows removed
+            kept = [i for i in range(GRID_HEIGHT) if self.rows[i] != FULL_ROW]
+            self.rows[:] = [0] * inc + [self.rows[i] for i in kept]
+            self.row_fill[:] = [0] * inc + [self.row_fill[i] for i in kept]
+            # Same length, so NumPy views from board_array() stay valid
+            board = self.board
+            self.board[:] = bytes(inc * GRID_WIDTH) + b''.join(board[i * GRID_WIDTH:(i + 1) * GRID_WIDTH] for i in kept)
+
+            # Remove the cleared rows from each column bitboard, top to bottom
+            for r in cleared:
+                above = (1 << r) - 1
+                for c in range(GRID_WIDTH):
+                    bits = self.cols[c]
+                    self.cols[c] = ((bits & above) << 1) | (bits >> (r + 1) << (r + 1))
+            self._refresh_columns(range(GRID_WIDTH))
                         
             self.score += inc * 100
+            self.lines += inc
+            self.board_version += 1
             
         return inc
 
@@ -261,19 +540,40 @@ class TetrisEngine:
 
     def rotate_piece(self):
         if not self.game_over:
-            self.current_piece.rotation = (self.current_piece.rotation + 1) % len(SHAPES[self.current_piece.shape_type])
+            self.current_piece.rotation = (self.current_piece.rotation + 1) % ROTATION_COUNTS[self.current_piece.shape_type]
             if not self.valid_space(self.current_piece):
                 # Revert
-                self.current_piece.rotation = (self.current_piece.rotation - 1) % len(SHAPES[self.current_piece.shape_type])
+                self.current_piece.rotation = (self.current_piece.rotation - 1) % ROTATION_COUNTS[self.current_piece.shape_type]
 
     def hard_drop(self):
         """Immediately drops the piece to the lowest valid position and locks it."""
         cleared = 0
         if not self.game_over:
-            while self.valid_space(self.current_piece):
-                self.current_piece.y += 1
-            # Back up one space since the last increment made it invalid
-            self.current_piece.y -= 1
+            self.current_piece.y += self.drop_distance(self.current_piece)
             # Lock the piece
             cleared = self.lock_piece()
         return cleared
+
+class RewindBuffer:
+    """
+    Ring buffer of the most recent `capacity` piece spawns, as engine snapshots. Call checkpoint()
+    after any input that may lock a piece; undo() rolls the engine back to before the last lock.
+    """
+    def __init__(self, capacity=32):
+        self.snapshots = deque(maxlen=capacity)
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def checkpoint(self, engine):
+        """Stores the engine state if a new piece has spawned since the last checkpoint."""
+        if not self.snapshots or self.snapshots[-1][0] != engine.pieces:
+            self.snapshots.append((engine.pieces, engine.snapshot()))
+
+    def undo(self, engine):
+        """Restores the state from when the previous piece spawned. Returns False if there is none."""
+        if len(self.snapshots) < 2 or self.snapshots[-1][0] != engine.pieces:
+            return False
+        self.snapshots.pop()
+        engine.restore(self.snapshots[-1][1])
+        return True